@@ -2,17 +2,24 @@
 """Skill distiller helper — mechanical operations for search, fetch, staging, checksums, and manifest management."""
 
 import argparse
+import copy
+import errno
 import hashlib
+import heapq
 import json
+import mmap
+import operator
 import os
+import random
+import re
 import shutil
 import subprocess
 import sys
+import threading
 import time
-import urllib.request
-import urllib.error
 import urllib.parse
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from pathlib import Path
 
@@ -20,6 +27,7 @@ DISTILLERY_DIR = Path(__file__).resolve().parent.parent
 STAGING_DIR = DISTILLERY_DIR / ".skill-distiller" / "sources"
 GENERATED_DIR = DISTILLERY_DIR / "generated-skills"
 ENV_FILE = DISTILLERY_DIR / ".env"
+CACHE_DIR = DISTILLERY_DIR / ".cache"
 PLUGIN_DIR = DISTILLERY_DIR.parent / "plugins" / "compound-engineering"
 # CWD-relative paths for npx skills add cleanup (fetch creates these in CWD)
 SKILLS_AGENT_DIR = Path(".agents/skills")
@@ -39,62 +47,196 @@ MIN_INSTALLS_FALLBACK = 50
 MIN_QUALIFYING = 3
 TOP_N = 10
 
-MAX_RETRIES = 2
+MAX_RETRIES = 4
 RETRY_DELAY = 1.0
-
-
-def _http_request(url, data=None, headers=None, timeout=30, retries=MAX_RETRIES):
-    """Make an HTTP request with retries on transient errors. Returns parsed JSON."""
+# Longest single retry wait; a server asking for longer (Retry-After) fails the request instead
+BACKOFF_CAP = 8.0
+# Cap on concurrent skills.sh requests (keeps us clear of rate limits)
+SEARCH_WORKERS = 8
+# Default cap on in-flight OpenRouter calls for test / ab-eval (--concurrency)
+OPENROUTER_WORKERS = 8
+
+HASH_CHUNK_SIZE = 1 << 20  # 1 MiB read buffer for multi-digest / pre-3.11 hashing
+HASH_WORKERS = 8
+MMAP_HASH_THRESHOLD = 1 << 20  # files this size or larger are hashed straight from a read-only mapping
+
+# On-disk response cache (disable with --no-cache)
+HTTP_CACHE_ENABLED = True
+SEARCH_CACHE_TTL = 3600  # 1 hour
+GROK_CACHE_TTL = 86400  # 24 hours
+# check-updates trusts recorded sha1s for manifests written within this window
+RECHECK_AFTER = 6 * 3600
+# Circuit breaker (per host; per provider for OpenRouter): after this many consecutive
+# transient failures (5xx, timeouts, connection errors) that circuit fails fast for the cooldown,
+# which doubles with each further failure up to BREAKER_MAX_COOLDOWN
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+BREAKER_MAX_COOLDOWN = 600.0
+
+
+def _backoff_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff capped at BACKOFF_CAP, never shorter than a server-supplied Retry-After.
+
+    Returns None when Retry-After asks for more than BACKOFF_CAP; the caller gives up rather than sleeping.
+    """
+    wait = random.uniform(0, min(BACKOFF_CAP, RETRY_DELAY * (2 ** attempt)))
+    if retry_after:
+        try:
+            requested = float(retry_after)
+        except ValueError:
+            # HTTP-date form: wait until that instant; unparseable or past dates keep the jittered delay
+            from email.utils import parsedate_to_datetime
+            try:
+                requested = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                requested = 0.0
+        if requested > BACKOFF_CAP:
+            return None
+        wait = max(wait, requested)
+    return wait
+
+
+_breaker = {}  # circuit -> [consecutive transient failures, monotonic time the circuit stays open until]
+_BREAKER_LOCK = threading.Lock()
+
+
+def _breaker_open(circuit):
+    """True while the circuit is open; after the cooldown one attempt is let through."""
+    with _BREAKER_LOCK:
+        state = _breaker.get(circuit)
+        return state is not None and time.monotonic() < state[1]
+
+
+def _breaker_record(circuit, failed):
+    """Count a transient failure against the circuit (opening it at the threshold), or reset on a response.
+
+    Each failure past the threshold, including a failed attempt after the cooldown, doubles the open window.
+    """
+    with _BREAKER_LOCK:
+        if not failed:
+            _breaker.pop(circuit, None)
+            return
+        state = _breaker.setdefault(circuit, [0, 0.0])
+        state[0] += 1
+        if state[0] >= BREAKER_THRESHOLD:
+            cooldown = min(BREAKER_MAX_COOLDOWN, BREAKER_COOLDOWN * 2 ** (state[0] - BREAKER_THRESHOLD))
+            state[1] = time.monotonic() + cooldown
+
+
+def _http_request(url, data=None, headers=None, timeout=30, retries=MAX_RETRIES, circuit=None):
+    """Make an HTTP request with retries on transient errors. Returns parsed JSON.
+
+    Failures count against circuit (default: the URL's host) for the circuit breaker.
+    """
+    # Lazy import: urllib.request pulls in http.client/ssl/email (~20 ms at startup),
+    # which offline commands (validate, token-count, eval-triggers) never need
+    import urllib.error
+    import urllib.request
+    # One connection per request (urllib sends Connection: close). Deliberately not pooled:
+    # calls are few, overlap via thread pools (search, test/ab-eval fan-out), and LLM latency
+    # dwarfs the TLS handshake. Stays on urllib so the script needs no third-party HTTP client.
     headers = headers or {}
     headers.setdefault("User-Agent", "skill-distiller/1.0")
+    circuit = circuit or urllib.parse.urlsplit(url).netloc
 
     for attempt in range(retries + 1):
+        if _breaker_open(circuit):
+            raise RuntimeError(f"Circuit open for {circuit}: {BREAKER_THRESHOLD}+ consecutive failures, not retrying")
         try:
             req = urllib.request.Request(url, data=data, headers=headers)
             with urllib.request.urlopen(req, timeout=timeout) as resp:
-                return json.loads(resp.read().decode())
+                # json.loads detects UTF-8 on bytes itself — no separate decode pass
+                result = json.loads(resp.read())
+            _breaker_record(circuit, failed=False)
+            return result
         except urllib.error.HTTPError as e:
             body = ""
             try:
                 body = e.read().decode()
             except Exception:
                 pass
+            # 5xx counts against the circuit; any other status proves it is up (429 is neutral)
+            if e.code >= 500:
+                _breaker_record(circuit, failed=True)
+            elif e.code != 429:
+                _breaker_record(circuit, failed=False)
             # Retry on 429 and 5xx
             if e.code in (429, 500, 502, 503, 504) and attempt < retries:
-                wait = RETRY_DELAY * (2 ** attempt)
-                print(f"HTTP {e.code} for {url}, retrying in {wait}s...", file=sys.stderr)
+                retry_after = e.headers.get("Retry-After") if e.headers else None
+                wait = _backoff_delay(attempt, retry_after)
+                if wait is None:
+                    raise RuntimeError(f"HTTP {e.code}: Retry-After {retry_after} exceeds {BACKOFF_CAP:g}s cap") from e
+                print(f"HTTP {e.code} for {url}, retrying in {wait:.1f}s...", file=sys.stderr)
                 time.sleep(wait)
                 continue
             raise RuntimeError(f"HTTP {e.code}: {body[:200]}") from e
         except urllib.error.URLError as e:
+            _breaker_record(circuit, failed=True)
             if attempt < retries:
-                wait = RETRY_DELAY * (2 ** attempt)
-                print(f"Connection error for {url}, retrying in {wait}s...", file=sys.stderr)
+                wait = _backoff_delay(attempt)
+                print(f"Connection error for {url}, retrying in {wait:.1f}s...", file=sys.stderr)
                 time.sleep(wait)
                 continue
             raise RuntimeError(f"Connection failed: {e.reason}") from e
         except (TimeoutError, OSError) as e:
+            _breaker_record(circuit, failed=True)
             if attempt < retries:
-                wait = RETRY_DELAY * (2 ** attempt)
-                print(f"Timeout for {url}, retrying in {wait}s...", file=sys.stderr)
+                wait = _backoff_delay(attempt)
+                print(f"Timeout for {url}, retrying in {wait:.1f}s...", file=sys.stderr)
                 time.sleep(wait)
                 continue
             raise RuntimeError(f"Request timed out: {e}") from e
 
 
+def _cached_http_request(url, data=None, headers=None, timeout=30, ttl=SEARCH_CACHE_TTL, circuit=None):
+    """_http_request backed by a TTL-bounded JSON cache in CACHE_DIR, keyed on sha1(url + body)."""
+    if not HTTP_CACHE_ENABLED:
+        return _http_request(url, data=data, headers=headers, timeout=timeout, circuit=circuit)
+
+    key = hashlib.sha1(url.encode() + (data or b"")).hexdigest()
+    cache_path = CACHE_DIR / f"{key}.json"
+    try:
+        if time.time() - cache_path.stat().st_mtime < ttl:
+            with open(cache_path) as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass  # miss, or unreadable entry — refetch
+
+    result = _http_request(url, data=data, headers=headers, timeout=timeout, circuit=circuit)
+    if "error" not in result:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial entry
+        tmp_path = cache_path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, cache_path)
+    return result
+
+
+def _search_one(query):
+    """Run a single skills.sh search. Returns (query, data, error)."""
+    encoded = urllib.parse.quote(query)
+    url = f"https://skills.sh/api/search?q={encoded}&limit=50"
+    try:
+        return query, _cached_http_request(url), None
+    except RuntimeError as e:
+        return query, None, e
+
+
 def search_skills(queries):
     """Search skills.sh API for each query, filter and deduplicate results."""
     all_skills = {}
     failed_queries = []
 
-    for query in queries:
-        encoded = urllib.parse.quote(query)
-        url = f"https://skills.sh/api/search?q={encoded}&limit=50"
-        try:
-            data = _http_request(url)
-        except RuntimeError as e:
-            print(f"Error: search failed for '{query}': {e}", file=sys.stderr)
-            failed_queries.append({"query": query, "error": str(e)})
+    # Queries run concurrently; map() keeps results in query order so dedup stays deterministic
+    workers = max(1, min(len(queries), SEARCH_WORKERS))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        responses = list(pool.map(_search_one, queries))
+
+    for query, data, err in responses:
+        if err is not None:
+            print(f"Error: search failed for '{query}': {err}", file=sys.stderr)
+            failed_queries.append({"query": query, "error": str(err)})
             continue
 
         skills = data.get("skills", [])
@@ -114,15 +256,14 @@ def search_skills(queries):
         print(f"Error: all {len(failed_queries)} search queries failed", file=sys.stderr)
         sys.exit(1)
 
-    # Sort by installs descending
-    ranked = sorted(all_skills.values(), key=lambda s: s["installs"], reverse=True)
-
-    # Filter: installs >= 100, top 10
-    qualified = [s for s in ranked if s["installs"] >= MIN_INSTALLS][:TOP_N]
+    # Filter: installs >= 100, top 10 by installs (nlargest == sorted(reverse=True)[:n], ties included)
+    by_installs = operator.itemgetter("installs")
+    candidates = all_skills.values()
+    qualified = heapq.nlargest(TOP_N, (s for s in candidates if s["installs"] >= MIN_INSTALLS), key=by_installs)
 
     # Fallback: if fewer than 3, lower threshold
     if len(qualified) < MIN_QUALIFYING:
-        qualified = [s for s in ranked if s["installs"] >= MIN_INSTALLS_FALLBACK][:TOP_N]
+        qualified = heapq.nlargest(TOP_N, (s for s in candidates if s["installs"] >= MIN_INSTALLS_FALLBACK), key=by_installs)
 
     # Include warnings about partial failures in stderr
     if failed_queries and all_skills:
@@ -150,13 +291,37 @@ def _check_npx_skills():
         sys.exit(1)
 
 
+def compute_digests(filepath, algorithms=("sha1",)):
+    """Compute several hex digests of a file in a single read. Returns {algorithm: hexdigest}."""
+    with open(filepath, "rb") as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_HASH_THRESHOLD:
+            # Hash the mapped pages directly: no copy from the page cache into a Python buffer
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return {a: hashlib.new(a, mm).hexdigest() for a in algorithms}
+        # file_digest (3.11+) reads and hashes in C, releasing the GIL — but takes one algorithm
+        if len(algorithms) == 1 and hasattr(hashlib, "file_digest"):
+            return {algorithms[0]: hashlib.file_digest(f, algorithms[0]).hexdigest()}
+        hashers = [hashlib.new(a) for a in algorithms]
+        # Same loop file_digest runs in C: readinto one reusable buffer, no bytes object per chunk
+        buf = bytearray(HASH_CHUNK_SIZE)
+        view = memoryview(buf)
+        while n := f.readinto(buf):
+            for h in hashers:
+                h.update(view[:n])
+    return {a: h.hexdigest() for a, h in zip(algorithms, hashers)}
+
+
 def compute_sha1(filepath):
     """Compute SHA-1 hex digest of a file."""
-    h = hashlib.sha1()
-    with open(filepath, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
+    return compute_digests(filepath, ("sha1",))["sha1"]
+
+
+def _sha1_if_present(filepath):
+    """compute_sha1, or None if the file does not exist."""
+    try:
+        return compute_sha1(filepath)
+    except FileNotFoundError:
+        return None
 
 
 def _resolve_moved_skill(old_id):
@@ -169,7 +334,7 @@ def _resolve_moved_skill(old_id):
     encoded = urllib.parse.quote(skill_name)
     url = f"https://skills.sh/api/search?q={encoded}&limit=50"
     try:
-        data = _http_request(url)
+        data = _cached_http_request(url)
     except RuntimeError:
         return None
     for s in data.get("skills", []):
@@ -182,21 +347,73 @@ def _resolve_moved_skill(old_id):
 
 
 def _stage_skill(skill_id):
-    """Move a fetched skill to staging and remove symlinks."""
+    """Move a fetched skill to staging and remove symlinks. Returns True if a fetched copy was staged."""
     agent_path = SKILLS_AGENT_DIR / skill_id
     staging_path = STAGING_DIR / skill_id
     symlink_path = SKILLS_SYMLINK_DIR / skill_id
 
     if agent_path.exists():
+        staging_path.parent.mkdir(parents=True, exist_ok=True)
+        # Rename the previous copy aside so the new one lands with a single rename(2)
+        stale_path = None
         if staging_path.exists():
-            shutil.rmtree(staging_path)
-        shutil.move(str(agent_path), str(staging_path))
+            stale_path = staging_path.with_name(f"{skill_id}.stale")
+            if stale_path.exists():
+                shutil.rmtree(stale_path)
+            os.replace(staging_path, stale_path)
+        try:
+            try:
+                os.replace(agent_path, staging_path)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                # CWD and distillery on different filesystems — rename can't cross devices
+                shutil.move(str(agent_path), str(staging_path))
+        except BaseException:
+            # Put the previous copy back rather than leaving the staging slot empty
+            if stale_path is not None:
+                if staging_path.exists():
+                    shutil.rmtree(staging_path)  # partial cross-device copy
+                os.replace(stale_path, staging_path)
+            raise
+        if stale_path is not None:
+            shutil.rmtree(stale_path)
+        staged = True
+    else:
+        staged = False
+
+    # Normally a (now dangling) symlink: unlink directly instead of probing it with three stats;
+    # a real directory (copy-mode install) refuses unlink and gets removed as a tree
+    try:
+        symlink_path.unlink()
+    except FileNotFoundError:
+        pass
+    except (IsADirectoryError, PermissionError):
+        shutil.rmtree(symlink_path)
+    return staged
 
-    if symlink_path.is_symlink() or symlink_path.exists():
-        if symlink_path.is_dir() and not symlink_path.is_symlink():
-            shutil.rmtree(symlink_path)
-        else:
-            symlink_path.unlink()
+
+def _run_fetch_cmd(cmd):
+    """Run an npx skills add command. Returns True on success."""
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=120)
+        return True
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        return False
+
+
+def _fetch_source_group(source_group):
+    """Run npx skills add for one (source, skills) group. Returns None on success, else an error message."""
+    source, group = source_group
+    skill_ids = [s["skillId"] for s in group]
+    # npx skills add requires full GitHub URL
+    source_url = source if source.startswith("http") else f"https://github.com/{source}"
+    cmd = ["npx", "skills", "add", source_url, "-s"] + skill_ids + ["-y", "--agent", "claude-code"]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=120)
+        return None
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        return e.stderr.strip()[:200] if hasattr(e, "stderr") and e.stderr else "timeout" if isinstance(e, subprocess.TimeoutExpired) else "unknown error"
 
 
 def fetch_skills(skills_list):
@@ -210,57 +427,68 @@ def fetch_skills(skills_list):
         by_source[skill["source"]].append(skill)
 
     fetch_failures = []
+    staged_count = 0
 
-    # Fetch each source group
-    for source, group in by_source.items():
-        skill_ids = [s["skillId"] for s in group]
-        # npx skills add requires full GitHub URL
-        source_url = source if source.startswith("http") else f"https://github.com/{source}"
-        cmd = ["npx", "skills", "add", source_url, "-s"] + skill_ids + ["-y", "--agent", "claude-code"]
-        try:
-            subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=120)
-        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
-            err_msg = e.stderr.strip()[:200] if hasattr(e, "stderr") and e.stderr else "timeout" if isinstance(e, subprocess.TimeoutExpired) else "unknown error"
+    # npx skills add runs one at a time: every install writes into the same CWD-relative
+    # .agents/skills and .claude/skills trees (and whatever state the CLI keeps there), which
+    # nothing guarantees is safe to share. Move-resolution lookups and hashing run concurrently.
+    groups = list(by_source.items())
+    group_errors = [_fetch_source_group(group) for group in groups]
+
+    for (source, group), err_msg in zip(groups, group_errors):
+        if err_msg is not None:
             print(f"Error: fetch failed for {source}: {err_msg}", file=sys.stderr)
-            # Try to resolve moved repos
-            for skill in group:
-                resolved = _resolve_moved_skill(skill["id"])
+            # Try to resolve moved repos (lookups are independent HTTP calls)
+            workers = max(1, min(len(group), SEARCH_WORKERS))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                resolutions = list(pool.map(_resolve_moved_skill, [s["id"] for s in group]))
+            retries = []
+            for skill, resolved in zip(group, resolutions):
                 if resolved:
                     new_source_url = f"https://github.com/{resolved['source']}"
                     retry_cmd = ["npx", "skills", "add", new_source_url, "-s", skill["skillId"], "-y", "--agent", "claude-code"]
                     print(f"  Resolved: {skill['id']} -> {resolved['id']}", file=sys.stderr)
-                    try:
-                        subprocess.run(retry_cmd, check=True, capture_output=True, text=True, timeout=120)
-                        skill["id"] = resolved["id"]
-                        skill["source"] = resolved["source"]
-                        skill["installs"] = resolved["installs"]
-                        _stage_skill(skill["skillId"])
-                    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
-                        print(f"  Retry also failed for {resolved['id']}", file=sys.stderr)
-                        fetch_failures.append({"id": skill["id"], "source": source, "error": err_msg})
+                    retries.append((skill, resolved, retry_cmd))
+                else:
+                    fetch_failures.append({"id": skill["id"], "source": source, "error": err_msg})
+
+            # Retries install into the same CWD too, so they stay serial
+            for skill, resolved, retry_cmd in retries:
+                if _run_fetch_cmd(retry_cmd):
+                    skill["id"] = resolved["id"]
+                    skill["source"] = resolved["source"]
+                    skill["installs"] = resolved["installs"]
+                    staged_count += _stage_skill(skill["skillId"])
                 else:
+                    print(f"  Retry also failed for {resolved['id']}", file=sys.stderr)
                     fetch_failures.append({"id": skill["id"], "source": source, "error": err_msg})
             continue
 
         # Move to staging and remove symlinks
         for skill in group:
-            _stage_skill(skill["skillId"])
+            staged_count += _stage_skill(skill["skillId"])
 
     # If ALL fetches failed, report error (caller decides severity)
     if fetch_failures and len(fetch_failures) == len(skills_list):
         print(f"Error: all {len(fetch_failures)} skill fetches failed", file=sys.stderr)
 
-    # Compute checksums and build result
+    # Compute checksums concurrently (file_digest releases the GIL), then build result.
+    # Missing files surface as None from the open itself; no separate exists() pass.
+    staged = [STAGING_DIR / s["skillId"] / "SKILL.md" for s in skills_list]
+    sha1_by_path = {}
+    if staged:
+        with ThreadPoolExecutor(max_workers=min(len(staged), HASH_WORKERS)) as pool:
+            sha1_by_path = {p: h for p, h in zip(staged, pool.map(_sha1_if_present, staged)) if h is not None}
+
     results = []
-    for skill in skills_list:
+    for skill, skill_md in zip(skills_list, staged):
         sid = skill["skillId"]
-        skill_md = STAGING_DIR / sid / "SKILL.md"
-        if skill_md.exists():
+        if skill_md in sha1_by_path:
             results.append({
                 "id": skill["id"],
                 "skillId": sid,
                 "installs": skill["installs"],
-                "sha1": compute_sha1(skill_md),
+                "sha1": sha1_by_path[skill_md],
                 "path": str(skill_md),
             })
         else:
@@ -284,53 +512,79 @@ def fetch_skills(skills_list):
         })
 
     # Clean up any leftover artifacts from npx skills add
-    # (e.g. skills with colons in IDs that don't match expected paths)
-    _cleanup_fetch_artifacts()
+    # (e.g. skills with colons in IDs that don't match expected paths).
+    # When every skill staged cleanly its own entries are already gone, so just
+    # drop the empty dirs; any residue falls through to the full sweep.
+    if not (staged_count == len(skills_list) and _remove_empty_agent_dirs()):
+        _cleanup_fetch_artifacts()
 
     return results
 
 
+def _remove_empty_agent_dirs():
+    """Remove .agents/skills/ and .agents/ if empty. Returns False if anything was left behind."""
+    for path in (SKILLS_AGENT_DIR, SKILLS_AGENT_DIR.parent):
+        try:
+            path.rmdir()
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+    return True
+
+
 def _cleanup_fetch_artifacts():
     """Remove leftover .agents/ entries and orphan symlinks in .claude/skills/."""
-    # Remove any remaining entries in .agents/skills/
+    # Remove any remaining entries in .agents/skills/ (DirEntry caches the file type)
     if SKILLS_AGENT_DIR.exists():
-        for entry in list(SKILLS_AGENT_DIR.iterdir()):
-            if entry.is_dir():
-                shutil.rmtree(entry)
+        with os.scandir(SKILLS_AGENT_DIR) as it:
+            entries = list(it)  # snapshot before deleting
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
             else:
-                entry.unlink()
-        # Remove .agents/skills/ and .agents/ if empty
-        try:
-            SKILLS_AGENT_DIR.rmdir()
-        except OSError:
-            pass
-        try:
-            SKILLS_AGENT_DIR.parent.rmdir()
-        except OSError:
-            pass
+                os.unlink(entry.path)
+        _remove_empty_agent_dirs()
 
     # Remove symlinks/dirs in .claude/skills/ that point into .agents/
     if SKILLS_SYMLINK_DIR.exists():
         agents_abs = str(SKILLS_AGENT_DIR.parent.resolve())
-        for entry in list(SKILLS_SYMLINK_DIR.iterdir()):
-            if entry.is_symlink():
-                try:
-                    target = str(Path(os.readlink(entry)).resolve())
-                except OSError:
-                    target = ""
-                if ".agents" in target or agents_abs in target:
-                    entry.unlink()
-
-
-def check_updates(name):
-    """Check for updates to a generated skill. Returns diff report."""
+        with os.scandir(SKILLS_SYMLINK_DIR) as it:
+            entries = list(it)
+        for entry in entries:
+            if not entry.is_symlink():
+                continue
+            try:
+                target = str(Path(os.readlink(entry.path)).resolve())
+            except OSError:
+                target = ""
+            if ".agents" in target or agents_abs in target:
+                os.unlink(entry.path)
+
+
+def _looks_unchanged(fresh, old):
+    """True if a re-searched source matches its manifest entry closely enough to skip re-fetching."""
+    return bool(old and old.get("sha1") and old.get("installs") == fresh.get("installs"))
+
+
+def _load_manifest(name):
+    """Read generated-skills/<name>/manifest.json. Returns (path, manifest); exits if missing."""
     manifest_path = GENERATED_DIR / name / "manifest.json"
-    if not manifest_path.exists():
+    try:
+        with open(manifest_path) as f:
+            return manifest_path, json.load(f)
+    except FileNotFoundError:
         print(f"Error: {manifest_path} not found", file=sys.stderr)
         sys.exit(1)
 
-    with open(manifest_path) as f:
-        manifest = json.load(f)
+
+def check_updates(name, force=False):
+    """Check for updates to a generated skill. Returns diff report.
+
+    Sources in a manifest younger than RECHECK_AFTER whose install counts are
+    unchanged reuse their recorded sha1 instead of being re-fetched, unless force=True.
+    """
+    manifest_path, manifest = _load_manifest(name)
 
     search_queries = manifest.get("search_queries", [manifest.get("query", name)])
     old_sources = {s["id"]: s for s in manifest.get("sources", [])}
@@ -339,43 +593,53 @@ def check_updates(name):
     # Re-search
     fresh_skills = search_skills(search_queries)
     fresh_ids = {s["id"] for s in fresh_skills}
-    old_ids = set(old_sources.keys())
 
-    # Fetch all (existing + new)
-    fetched = fetch_skills(fresh_skills)
+    # Skip the npx fetch for sources that look untouched since a recent manifest write
+    reused = []
+    to_fetch = fresh_skills
+    manifest_age = time.time() - manifest_path.stat().st_mtime
+    if not force and manifest_age < RECHECK_AFTER:
+        reused = [s for s in fresh_skills if _looks_unchanged(s, old_sources.get(s["id"]))]
+        reused_ids = {s["id"] for s in reused}
+        to_fetch = [s for s in fresh_skills if s["id"] not in reused_ids]
+
+    # Fetch the rest (existing + new)
+    fetched = fetch_skills(to_fetch) if to_fetch else []
     # Separate successful fetches from failures
     fetched_ok = {f["id"]: f for f in fetched if "sha1" in f}
     fetched_failed = [f for f in fetched if f.get("status") in ("fetch_failed", "missing")]
+    for skill in reused:
+        fetched_ok.setdefault(skill["id"], {"id": skill["id"], "sha1": old_sources[skill["id"]]["sha1"]})
 
-    # Categorize
+    # Categorize: one lookup per fetched source, removals via set difference on key views
     unchanged = []
     changed = []
     new_sources = []
-    removed = []
 
     for fid, fdata in fetched_ok.items():
-        if fid in old_sources:
-            old_sha1 = old_sources[fid].get("sha1")
-            if old_sha1 and old_sha1 == fdata["sha1"]:
-                unchanged.append({"id": fid, "sha1": fdata["sha1"]})
-            else:
-                changed.append({
-                    "id": fid,
-                    "old_sha1": old_sha1 or "unknown",
-                    "new_sha1": fdata["sha1"],
-                    "path": fdata["path"],
-                })
-        else:
+        old = old_sources.get(fid)
+        if old is None:
             new_sources.append({
                 "id": fid,
                 "installs": fdata["installs"],
                 "sha1": fdata["sha1"],
                 "path": fdata["path"],
             })
+            continue
+        old_sha1 = old.get("sha1")
+        if old_sha1 and old_sha1 == fdata["sha1"]:
+            unchanged.append({"id": fid, "sha1": fdata["sha1"]})
+        else:
+            changed.append({
+                "id": fid,
+                "old_sha1": old_sha1 or "unknown",
+                "new_sha1": fdata["sha1"],
+                "path": fdata["path"],
+            })
 
-    for oid in old_ids:
-        if oid not in fetched_ok and oid not in fresh_ids:
-            removed.append({"id": oid})
+    removed_ids = old_sources.keys() - fetched_ok.keys() - fresh_ids
+    # Report removals in manifest order (iterating the set would be arbitrary)
+    removed = [{"id": oid} for oid in old_sources if oid in removed_ids]
 
     # Early exit check
     if not changed and not new_sources and not removed:
@@ -397,15 +661,21 @@ def check_updates(name):
     return result
 
 
-def update_manifest(name, tok_count, sources_json):
-    """Update manifest.json preserving query, search_queries, instructions."""
-    manifest_path = GENERATED_DIR / name / "manifest.json"
-    if not manifest_path.exists():
-        print(f"Error: {manifest_path} not found", file=sys.stderr)
-        sys.exit(1)
+def _write_manifest(manifest_path, manifest, compact=False):
+    """Write manifest.json atomically (temp file + rename) so a crash never leaves it torn."""
+    if compact:
+        text = json.dumps(manifest, separators=(",", ":"))
+    else:
+        text = json.dumps(manifest, indent=2)
+    # Encoded up front and written in one call; binary mode also keeps \n line endings on Windows
+    tmp_path = manifest_path.with_suffix(".json.tmp")
+    tmp_path.write_bytes(text.encode() + b"\n")
+    os.replace(tmp_path, manifest_path)
 
-    with open(manifest_path) as f:
-        manifest = json.load(f)
+
+def update_manifest(name, tok_count, sources_json, compact=False):
+    """Update manifest.json preserving query, search_queries, instructions."""
+    manifest_path, manifest = _load_manifest(name)
 
     sources = json.loads(sources_json) if isinstance(sources_json, str) else sources_json
 
@@ -413,9 +683,7 @@ def update_manifest(name, tok_count, sources_json):
     manifest["token_count"] = tok_count
     manifest["sources"] = sources
 
-    with open(manifest_path, "w") as f:
-        json.dump(manifest, f, indent=2)
-        f.write("\n")
+    _write_manifest(manifest_path, manifest, compact=compact)
 
     print(f"Updated {manifest_path}", file=sys.stderr)
 
@@ -427,17 +695,31 @@ def token_count(filepath):
     return round(size / 3.5)
 
 
+# KEY=value lines; comment lines (leading #) and lines without '=' don't match
+_ENV_LINE_RE = re.compile(r"^[ \t]*([^#\s=][^=\n]*?)[ \t]*=(.*)$", re.MULTILINE)
+_env_cache = {}  # path -> ((mtime_ns, size), {key: value})
+
+
 def load_env():
-    """Load key=value pairs from .env file."""
-    if not ENV_FILE.exists():
+    """Load key=value pairs from .env file without overriding variables already set.
+
+    The parsed file is cached per path and re-parsed only when its mtime or size changes.
+    """
+    try:
+        st = ENV_FILE.stat()
+    except OSError:
         return
-    with open(ENV_FILE) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#") and "=" in line:
-                key, _, value = line.partition("=")
-                value = value.strip().strip("'\"")
-                os.environ.setdefault(key.strip(), value)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _env_cache.get(ENV_FILE)
+    if cached and cached[0] == stamp:
+        values = cached[1]
+    else:
+        values = {}
+        for m in _ENV_LINE_RE.finditer(ENV_FILE.read_text(encoding="utf-8")):
+            values.setdefault(m.group(1), m.group(2).strip().strip("'\""))  # first assignment wins
+        _env_cache[ENV_FILE] = (stamp, values)
+    for key, value in values.items():
+        os.environ.setdefault(key, value)
 
 
 def get_engagement_threshold(top_installs):
@@ -508,7 +790,7 @@ If no qualifying posts are found, return: {"findings": [], "summary": "No signif
     }).encode()
 
     try:
-        data = _http_request(
+        data = _cached_http_request(
             GROK_API_URL,
             data=payload,
             headers={
@@ -516,6 +798,7 @@ If no qualifying posts are found, return: {"findings": [], "summary": "No signif
                 "Authorization": f"Bearer {api_key}",
             },
             timeout=120,
+            ttl=GROK_CACHE_TTL,
         )
     except RuntimeError as e:
         print(f"Error: Grok API request failed: {e}", file=sys.stderr)
@@ -542,15 +825,9 @@ If no qualifying posts are found, return: {"findings": [], "summary": "No signif
         return {"raw": content, "findings": [], "summary": "Failed to parse structured response."}
 
 
-def backfill_sha1(name):
+def backfill_sha1(name, compact=False):
     """Fetch all sources for a skill and add sha1 checksums to the manifest."""
-    manifest_path = GENERATED_DIR / name / "manifest.json"
-    if not manifest_path.exists():
-        print(f"Error: {manifest_path} not found", file=sys.stderr)
-        sys.exit(1)
-
-    with open(manifest_path) as f:
-        manifest = json.load(f)
+    manifest_path, manifest = _load_manifest(name)
 
     sources = manifest.get("sources", [])
     # Check if any source already has sha1
@@ -596,19 +873,123 @@ def backfill_sha1(name):
 
     manifest["sources"] = updated_sources
 
-    with open(manifest_path, "w") as f:
-        json.dump(manifest, f, indent=2)
-        f.write("\n")
+    _write_manifest(manifest_path, manifest, compact=compact)
 
     cleanup()
     print(f"Backfilled sha1 for {name}: {sum(1 for s in updated_sources if 'sha1' in s)}/{len(updated_sources)} sources", file=sys.stderr)
     return manifest
 
 
-def validate(name):
-    """Validate a generated skill using multi-gate scoring. Returns JSON with gates, score, and pass/fail."""
-    import re
+# Validation patterns, compiled once. Bytes patterns: the body is scanned undecoded
+# (every pattern is ASCII, so matching on UTF-8 bytes gives the same hits)
+_NAME_RE = re.compile(r'^[a-z0-9][a-z0-9-]*$')
+_BANNED_NAME_PARTS = ("anthropic", "claude")
+_PLACEHOLDER_PATTERN = b"|".join(b"(?:" + p + b")" for p in (
+    rb'\[TODO\b', rb'\[FILL\s*IN\b', rb'\[INSERT\b', rb'\[REPLACE\b',
+    rb'\bTBD\b', rb'\bFIXME\b', rb'\bXXX\b', rb'\[YOUR\b', rb'\[EXAMPLE\b',
+    rb'<your[_-]', rb'<insert[_-]', rb'<add[_-]',
+))
+_SECOND_PERSON_PATTERN = rb'\byou\s+(?:should|must|can|need|might|could|would)\b'
+# Placeholder and second-person hits can never overlap, so one tagged alternation finds both
+_BODY_SCAN_RE = re.compile(
+    b"(?P<placeholder>" + _PLACEHOLDER_PATTERN + b")|(?P<second_person>" + _SECOND_PERSON_PATTERN + b")",
+    re.IGNORECASE,
+)
+_HAS_HEADING_RE = re.compile(rb'^#+\s+\S', re.MULTILINE)
+_HEADING_RE = re.compile(rb'^(#+)\s+([^\n]+)', re.MULTILINE)
+_HEADING_PREFIX_RE = re.compile(rb'(#+)\s+')
+_NEWLINES_RE = re.compile(rb'\n*')
+_NAKED_NEG_RE = re.compile(rb"(?:^|\n)[^\n]*(?:don't|do not|never|avoid)\b[^\n]*$", re.IGNORECASE | re.MULTILINE)
+_EM_DASH = " — ".encode()
+# Frontmatter fields Claude Code ignores
+_INERT_FIELDS = frozenset({"triggers", "role", "scope", "domain", "output-format", "author",
+                           "version", "license", "related-skills", "tags"})
+
+
+VALIDATION_MAX_SCORE = 7  # number of gates
+
+
+def _validation_report(gates, issues, warnings, body_tokens, total_tokens):
+    """Score gates and assemble the validate() result."""
+    # sum() over a list of bools runs in C; no generator frame per gate
+    score = sum([g["pass"] for g in gates.values()])
+    return {
+        "valid": len(issues) == 0,
+        "passed": score >= VALIDATION_MAX_SCORE - 1,  # pass threshold: miss at most 1 gate
+        "score": score,
+        "max_score": VALIDATION_MAX_SCORE,
+        "gates": gates,
+        "body_tokens": body_tokens,
+        "total_tokens": total_tokens,
+        "issues": issues,
+        "warnings": warnings,
+    }
+
+
+def _verdict_decided(gates):
+    """True once enough gates have failed that the remaining ones cannot make the skill pass."""
+    return sum([not g["pass"] for g in gates.values()]) >= 2
+
+
+VALIDATE_CACHE_SIZE = 1024
+_validate_cache = {}  # (skill_dir, fail_fast) -> (input signature, report)
+
+
+def _scan_skill_dir(skill_dir):
+    """One scandir pass over a skill directory (plus references/).
+
+    Returns the (mtime_ns, size) signature of SKILL.md, manifest.json and each references/*.md,
+    which changes whenever a validate result could.
+    """
+    files = {}
+    refs = []
+    try:
+        with os.scandir(skill_dir) as entries:
+            for entry in entries:
+                if entry.name in ("SKILL.md", "manifest.json") and entry.is_file():
+                    st = entry.stat()
+                    files[entry.name] = (st.st_mtime_ns, st.st_size)
+                elif entry.name == "references" and entry.is_dir():
+                    with os.scandir(entry.path) as ref_entries:
+                        for ref in ref_entries:
+                            if ref.name.endswith(".md") and ref.is_file():
+                                st = ref.stat()
+                                refs.append((ref.name, st.st_mtime_ns, st.st_size))
+    except OSError:
+        pass
+    return files.get("SKILL.md"), files.get("manifest.json"), tuple(sorted(refs))
+
+
+def validate(name, fail_fast=False):
+    """Validate a generated skill using multi-gate scoring. Returns JSON with gates, score, and pass/fail.
+
+    With fail_fast=True, stops as soon as the pass/fail verdict is decided (a second failing gate)
+    and reports only the gates run so far; a skill that would pass is always checked in full.
+    Reports are memoized per skill until SKILL.md, manifest.json or a reference file changes.
+    """
+    skill_dir = GENERATED_DIR / name
+    key = (skill_dir, fail_fast)
+    signature = _scan_skill_dir(skill_dir)
+    cached = _validate_cache.get(key)
+    if cached and cached[0] == signature and signature[0] is not None:
+        return copy.deepcopy(cached[1])
+
+    report = _validate_uncached(name, fail_fast, refs=signature[2])
+    if signature[0] is not None:  # never cache the missing-SKILL.md report
+        if len(_validate_cache) >= VALIDATE_CACHE_SIZE:
+            _validate_cache.pop(next(iter(_validate_cache)))  # evict oldest
+        _validate_cache[key] = (signature, copy.deepcopy(report))
+    return report
+
+
+def _validate_uncached(name, fail_fast, refs):
+    """Run the validation gates for validate(), without memoization.
+
+    refs is the (name, mtime_ns, size) list of references/*.md from _scan_skill_dir.
+    """
     import yaml  # lazy import — only needed here
+    # libyaml-backed loader when PyYAML was built with it; same safe subset either way
+    yaml_loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
     skill_dir = GENERATED_DIR / name
     skill_path = skill_dir / "SKILL.md"
@@ -618,24 +999,25 @@ def validate(name):
     gates = {}
 
     # --- File existence ---
-    if not skill_path.exists():
+    # Kept as bytes: only the frontmatter needs decoding (yaml does that itself)
+    try:
+        content = skill_path.read_bytes()
+    except FileNotFoundError:
         return {
-            "valid": False, "score": 0, "max_score": 7, "passed": False,
+            "valid": False, "score": 0, "max_score": VALIDATION_MAX_SCORE, "passed": False,
             "gates": {"file_exists": {"pass": False, "detail": f"SKILL.md not found at {skill_path}"}},
             "body_tokens": 0, "total_tokens": 0, "issues": [f"SKILL.md not found at {skill_path}"], "warnings": [],
         }
 
-    content = skill_path.read_text()
-
     # --- Gate 1: YAML frontmatter ---
     frontmatter = {}
     body = content
     gate1_issues = []
-    if content.startswith("---"):
-        parts = content.split("---", 2)
+    if content.startswith(b"---"):
+        parts = content.split(b"---", 2)
         if len(parts) >= 3:
             try:
-                frontmatter = yaml.safe_load(parts[1]) or {}
+                frontmatter = yaml.load(parts[1], Loader=yaml_loader) or {}
             except Exception as e:
                 gate1_issues.append(f"Invalid YAML: {e}")
             body = parts[2].strip()
@@ -643,15 +1025,19 @@ def validate(name):
             gate1_issues.append("Opening --- without closing ---")
     else:
         gate1_issues.append("No YAML frontmatter found")
+    body_tokens = round(len(body) / 3.5)
+    # Reference sizes come from the caller's scandir pass; no re-stat
+    ref_tokens = [(ref_name, round(ref_size / 3.5)) for ref_name, _, ref_size in refs]
+    total_tokens = body_tokens + sum([tokens for _, tokens in ref_tokens])
 
-    inert_fields = {"triggers", "role", "scope", "domain", "output-format", "author",
-                    "version", "license", "related-skills", "tags"}
-    found_inert = inert_fields & set(frontmatter.keys())
+    found_inert = _INERT_FIELDS & frontmatter.keys()
     if found_inert:
         gate1_issues.append(f"Inert fields: {', '.join(sorted(found_inert))}")
 
     gates["frontmatter"] = {"pass": len(gate1_issues) == 0, "detail": "; ".join(gate1_issues) if gate1_issues else "ok"}
     issues.extend(gate1_issues)
+    if fail_fast and _verdict_decided(gates):
+        return _validation_report(gates, issues, warnings, body_tokens, total_tokens)
 
     # --- Gate 2: Name constraints ---
     gate2_issues = []
@@ -659,16 +1045,19 @@ def validate(name):
         gate2_issues.append("Missing name")
     else:
         fm_name = frontmatter["name"]
-        if not re.match(r'^[a-z0-9][a-z0-9-]*$', fm_name):
+        if not _NAME_RE.match(fm_name):
             gate2_issues.append(f"Must be lowercase/numbers/hyphens: '{fm_name}'")
         if len(fm_name) > 64:
             gate2_issues.append(f"Exceeds 64 chars: {len(fm_name)}")
-        for banned in ("anthropic", "claude"):
-            if banned in fm_name.lower():
+        lowered = fm_name.lower()
+        for banned in _BANNED_NAME_PARTS:
+            if banned in lowered:
                 gate2_issues.append(f"Must not contain '{banned}'")
 
     gates["name"] = {"pass": len(gate2_issues) == 0, "detail": "; ".join(gate2_issues) if gate2_issues else "ok"}
     issues.extend(gate2_issues)
+    if fail_fast and _verdict_decided(gates):
+        return _validation_report(gates, issues, warnings, body_tokens, total_tokens)
 
     # --- Gate 3: Description constraints ---
     gate3_issues = []
@@ -682,9 +1071,10 @@ def validate(name):
 
     gates["description"] = {"pass": len(gate3_issues) == 0, "detail": "; ".join(gate3_issues) if gate3_issues else "ok"}
     issues.extend(gate3_issues)
+    if fail_fast and _verdict_decided(gates):
+        return _validation_report(gates, issues, warnings, body_tokens, total_tokens)
 
     # --- Gate 4: Body token budget ---
-    body_tokens = round(len(body.encode()) / 3.5)
     gate4_issues = []
     if body_tokens > 2000:
         gate4_issues.append(f"Exceeds 2K hard cap (~{body_tokens} tokens)")
@@ -695,52 +1085,58 @@ def validate(name):
 
     gates["token_budget"] = {"pass": len(gate4_issues) == 0, "detail": "; ".join(gate4_issues) if gate4_issues else f"~{body_tokens} tokens"}
     issues.extend(gate4_issues)
+    if fail_fast and _verdict_decided(gates):
+        return _validation_report(gates, issues, warnings, body_tokens, total_tokens)
 
     # --- Gate 5: No placeholder text ---
-    placeholder_patterns = [
-        r'\[TODO\b', r'\[FILL\s*IN\b', r'\[INSERT\b', r'\[REPLACE\b',
-        r'\bTBD\b', r'\bFIXME\b', r'\bXXX\b', r'\[YOUR\b', r'\[EXAMPLE\b',
-        r'<your[_-]', r'<insert[_-]', r'<add[_-]',
-    ]
+    # Same pass also counts second-person phrasing for the style warnings below
     placeholder_hits = []
-    for pat in placeholder_patterns:
-        matches = re.findall(pat, body, re.IGNORECASE)
-        if matches:
-            placeholder_hits.extend(matches)
+    second_person = 0
+    for m in _BODY_SCAN_RE.finditer(body):
+        if m.lastgroup == "placeholder":
+            placeholder_hits.append(m.group())
+        else:
+            second_person += 1
     gate5_issues = []
     if placeholder_hits:
-        gate5_issues.append(f"Found {len(placeholder_hits)} placeholder(s): {', '.join(placeholder_hits[:5])}")
+        hits = ", ".join(h.decode(errors="replace") for h in placeholder_hits[:5])
+        gate5_issues.append(f"Found {len(placeholder_hits)} placeholder(s): {hits}")
 
     gates["no_placeholders"] = {"pass": len(gate5_issues) == 0, "detail": "; ".join(gate5_issues) if gate5_issues else "ok"}
     issues.extend(gate5_issues)
+    if fail_fast and _verdict_decided(gates):
+        return _validation_report(gates, issues, warnings, body_tokens, total_tokens)
 
     # --- Gate 6: Completeness ---
     gate6_issues = []
-    has_heading = bool(re.search(r'^#+\s+\S', body, re.MULTILINE))
+    has_heading = bool(_HAS_HEADING_RE.search(body))
     if not has_heading:
         gate6_issues.append("No markdown headings found")
     # Check for empty sections (heading followed by same-or-lower-level heading or end, not parent→child)
     empty_sections = []
-    for m in re.finditer(r'^(#+)\s+([^\n]+)', body, re.MULTILINE):
+    for m in _HEADING_RE.finditer(body):
         level = len(m.group(1))
-        after = body[m.end():].lstrip('\n')
-        next_heading = re.match(r'^(#+)\s+', after)
-        if not after or (next_heading and len(next_heading.group(1)) <= level):
-            empty_sections.append(m.group(0).strip())
+        # Skip blank lines in place rather than slicing off the rest of the body
+        pos = _NEWLINES_RE.match(body, m.end()).end()
+        next_heading = _HEADING_PREFIX_RE.match(body, pos)
+        if pos == len(body) or (next_heading and len(next_heading.group(1)) <= level):
+            empty_sections.append(m.group(0).strip().decode(errors="replace"))
     if empty_sections:
         gate6_issues.append(f"{len(empty_sections)} empty section(s): {', '.join(s.strip()[:30] for s in empty_sections[:3])}")
 
     gates["completeness"] = {"pass": len(gate6_issues) == 0, "detail": "; ".join(gate6_issues) if gate6_issues else "ok"}
     issues.extend(gate6_issues)
+    if fail_fast and _verdict_decided(gates):
+        return _validation_report(gates, issues, warnings, body_tokens, total_tokens)
 
     # --- Gate 7: Manifest integrity ---
     gate7_issues = []
-    if not manifest_path.exists():
-        gate7_issues.append(f"manifest.json not found")
-    else:
+    try:
         with open(manifest_path) as f:
             manifest = json.load(f)
-
+    except FileNotFoundError:
+        gate7_issues.append("manifest.json not found")
+    else:
         if "search_queries" not in manifest:
             gate7_issues.append("Missing search_queries")
         if "sources" not in manifest or not manifest["sources"]:
@@ -752,7 +1148,7 @@ def validate(name):
 
         # Token count drift
         if "token_count" in manifest:
-            actual = token_count(str(skill_path))
+            actual = round(len(content) / 3.5)  # same heuristic as token_count, no re-stat
             recorded = manifest["token_count"]
             drift = abs(actual - recorded)
             if drift > 50:
@@ -762,46 +1158,20 @@ def validate(name):
     issues.extend(gate7_issues)
 
     # --- Style warnings (not gated) ---
-    second_person = re.findall(r'\byou\s+(?:should|must|can|need|might|could|would)\b', body, re.IGNORECASE)
     if second_person:
-        warnings.append(f"Second person found ({len(second_person)}x) — use imperative instead of 'you should...'")
+        warnings.append(f"Second person found ({second_person}x) — use imperative instead of 'you should...'")
 
-    naked_negs = re.findall(r"(?:^|\n)[^\n]*(?:don't|do not|never|avoid)\b[^\n]*$", body, re.IGNORECASE | re.MULTILINE)
-    without_alternative = [n.strip() for n in naked_negs if " instead" not in n.lower() and " use " not in n.lower() and " — " not in n]
+    naked_negs = _NAKED_NEG_RE.findall(body)
+    without_alternative = [n.strip() for n in naked_negs if b" instead" not in n.lower() and b" use " not in n.lower() and _EM_DASH not in n]
     if without_alternative:
         warnings.append(f"Possible naked negations (no alternative given): {len(without_alternative)} lines")
 
     # --- References check ---
-    refs_dir = skill_dir / "references"
-    if refs_dir.exists():
-        for ref_file in refs_dir.iterdir():
-            if ref_file.suffix == ".md":
-                ref_tokens = round(ref_file.stat().st_size / 3.5)
-                if ref_tokens > 2000:
-                    issues.append(f"Reference {ref_file.name} exceeds 2K tokens (~{ref_tokens})")
-
-    # --- Scoring ---
-    total_tokens = body_tokens
-    if refs_dir.exists():
-        for ref_file in refs_dir.iterdir():
-            if ref_file.suffix == ".md":
-                total_tokens += round(ref_file.stat().st_size / 3.5)
-
-    score = sum(1 for g in gates.values() if g["pass"])
-    max_score = len(gates)
-    passed = score >= max_score - 1  # pass threshold: miss at most 1 gate
+    for ref_name, tokens in ref_tokens:
+        if tokens > 2000:
+            issues.append(f"Reference {ref_name} exceeds 2K tokens (~{tokens})")
 
-    return {
-        "valid": len(issues) == 0,
-        "passed": passed,
-        "score": score,
-        "max_score": max_score,
-        "gates": gates,
-        "body_tokens": body_tokens,
-        "total_tokens": total_tokens,
-        "issues": issues,
-        "warnings": warnings,
-    }
+    return _validation_report(gates, issues, warnings, body_tokens, total_tokens)
 
 
 def _parse_model_spec(model):
@@ -815,8 +1185,20 @@ def _parse_model_spec(model):
     return model_id, provider_slug
 
 
-def _openrouter_request(api_key, model_id, provider_slug, messages, max_tokens, temperature=0.2):
-    """Single OpenRouter API call. Returns dict with response/tokens/status or error."""
+# Serializes progress lines from concurrent workers
+_PROGRESS_LOCK = threading.Lock()
+
+
+def _progress(msg):
+    with _PROGRESS_LOCK:
+        print(msg, file=sys.stderr)
+
+
+def _openrouter_request(api_key, model_id, provider_slug, messages, max_tokens, temperature=0.2, cache_ttl=None):
+    """Single OpenRouter API call. Returns dict with response/tokens/status or error.
+
+    With cache_ttl, identical requests (same model, messages and settings) are served from the on-disk cache.
+    """
     body = {
         "model": model_id,
         "messages": messages,
@@ -827,16 +1209,19 @@ def _openrouter_request(api_key, model_id, provider_slug, messages, max_tokens,
         body["provider"] = {"order": [provider_slug], "allow_fallbacks": False}
 
     payload = json.dumps(body).encode()
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}",
+    }
+    # OpenRouter fronts many upstream providers: trip the breaker per provider (or per model when
+    # OpenRouter picks), so one failing provider doesn't cut off every other model in the run
+    circuit = f"{urllib.parse.urlsplit(OPENROUTER_API_URL).netloc}:{provider_slug or model_id}"
     try:
-        data = _http_request(
-            OPENROUTER_API_URL,
-            data=payload,
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {api_key}",
-            },
-            timeout=120,
-        )
+        if cache_ttl:
+            data = _cached_http_request(OPENROUTER_API_URL, data=payload, headers=headers, timeout=120, ttl=cache_ttl,
+                                        circuit=circuit)
+        else:
+            data = _http_request(OPENROUTER_API_URL, data=payload, headers=headers, timeout=120, circuit=circuit)
         response = data.get("choices", [{}])[0].get("message", {}).get("content", "")
         usage = data.get("usage", {})
         return {"response": response, "tokens": usage.get("total_tokens", 0), "status": "ok"}
@@ -844,8 +1229,18 @@ def _openrouter_request(api_key, model_id, provider_slug, messages, max_tokens,
         return {"response": "", "error": str(e), "status": "error"}
 
 
-def test_skill(name, prompts, models=None, max_tokens=2000):
-    """Test a skill against multiple models via OpenRouter. Returns per-model, per-prompt results."""
+def _request_key(model, i, prompt, share):
+    """Identity of a model x prompt call within one run. With share, duplicate prompts map to one call."""
+    return (model, prompt) if share else (model, i)
+
+
+def test_skill(name, prompts, models=None, max_tokens=2000, concurrency=OPENROUTER_WORKERS, cache_ttl=None,
+               cache_responses=False):
+    """Test a skill against multiple models via OpenRouter. Returns per-model, per-prompt results.
+
+    With cache_ttl, responses for an unchanged skill/model/prompt are reused from the on-disk cache.
+    With cache_responses, duplicate prompts share one call per model instead of one call each.
+    """
     load_env()
     api_key = os.environ.get("OPENROUTER_API_KEY", "")
     if not api_key:
@@ -853,24 +1248,33 @@ def test_skill(name, prompts, models=None, max_tokens=2000):
         sys.exit(1)
 
     skill_path = GENERATED_DIR / name / "SKILL.md"
-    if not skill_path.exists():
+    try:
+        skill_content = skill_path.read_text()
+    except FileNotFoundError:
         print(f"Error: {skill_path} not found", file=sys.stderr)
         sys.exit(1)
-
-    skill_content = skill_path.read_text()
     models = models or DEFAULT_TEST_MODELS
-
-    results = []
-    for model in models:
-        for i, prompt in enumerate(prompts):
-            model_id, provider_slug = _parse_model_spec(model)
-            result = _openrouter_request(
-                api_key, model_id, provider_slug,
-                [{"role": "system", "content": skill_content}, {"role": "user", "content": prompt}],
-                max_tokens,
-            )
-            results.append({"model": model, "prompt": prompt, **result})
-            print(f"  {model} × prompt {i+1}: {result['status']}", file=sys.stderr)
+    specs = {model: _parse_model_spec(model) for model in models}  # once per model, not per prompt
+
+    def run(task):
+        model, i, prompt = task
+        model_id, provider_slug = specs[model]
+        result = _openrouter_request(
+            api_key, model_id, provider_slug,
+            [{"role": "system", "content": skill_content}, {"role": "user", "content": prompt}],
+            max_tokens, cache_ttl=cache_ttl,
+        )
+        _progress(f"  {model} × prompt {i+1}: {result['status']}")
+        return {"model": model, "prompt": prompt, **result}
+
+    # Calls are independent network waits, run concurrently
+    slots = [(model, i, prompt) for model in models for i, prompt in enumerate(prompts)]
+    tasks = {}
+    for slot in slots:
+        tasks.setdefault(_request_key(*slot, cache_responses), slot)
+    with ThreadPoolExecutor(max_workers=max(1, min(len(tasks), concurrency))) as pool:
+        outcomes = dict(zip(tasks, pool.map(run, tasks.values())))
+    results = [outcomes[_request_key(*slot, cache_responses)] for slot in slots]
 
     return {"skill": name, "models": models, "results": results}
 
@@ -878,73 +1282,97 @@ def test_skill(name, prompts, models=None, max_tokens=2000):
 SKILL_PATTERNS_DEFAULT = PLUGIN_DIR / "hooks" / "skill-patterns.sh"
 
 
+# SKILL_PATTERNS[name]='regex' (or "regex") assignments in skill-patterns.sh
+_SKILL_PATTERN_ENTRY_RE = re.compile(r"""SKILL_PATTERNS\[([^\]]+)\]=(?:'([^']+)'|"([^"]+)")""")
+_skill_patterns_cache = {}  # path -> ((mtime_ns, size), {name: pattern})
+
+
+def _parse_skill_patterns(text):
+    """Map each SKILL_PATTERNS[name] assignment in shell source text to its pattern."""
+    patterns = {}
+    for name, single, double in _SKILL_PATTERN_ENTRY_RE.findall(text):
+        patterns.setdefault(name, single or double)  # first assignment wins, as before
+    return patterns
+
+
+def _skill_patterns(path):
+    """Parse every SKILL_PATTERNS entry in path once, re-reading only when the file changes."""
+    try:
+        st = path.stat()
+    except OSError:
+        return {}
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _skill_patterns_cache.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    patterns = _parse_skill_patterns(path.read_text())
+    _skill_patterns_cache[path] = (stamp, patterns)
+    return patterns
+
+
 def _load_skill_pattern(name, patterns_file=None):
     """Extract regex pattern for a skill from skill-patterns.sh. Returns pattern string or None."""
-    import re as _re
     path = Path(patterns_file) if patterns_file else SKILL_PATTERNS_DEFAULT
-    if not path.exists():
-        return None
-    content = path.read_text()
-    m = _re.search(rf"SKILL_PATTERNS\[{_re.escape(name)}\]='([^']+)'", content)
-    if not m:
-        m = _re.search(rf'SKILL_PATTERNS\[{_re.escape(name)}\]="([^"]+)"', content)
-    return m.group(1) if m else None
+    return _skill_patterns(path).get(name)
 
 
-def eval_triggers(name, queries, pattern=None, patterns_file=None):
-    """Test trigger regex patterns against should/shouldn't-trigger queries. Returns match results with precision/recall."""
-    import re as _re
+def eval_triggers(name, queries, pattern=None, patterns_file=None, detail=True):
+    """Test trigger regex patterns against should/shouldn't-trigger queries. Returns match results with precision/recall.
 
+    With detail=False, only metrics are computed; the per-query matches list is omitted.
+    """
     if pattern is None:
         pattern = _load_skill_pattern(name, patterns_file)
     if pattern is None:
         print(f"Error: no pattern found for '{name}'. Provide --pattern or ensure skill-patterns.sh exists.", file=sys.stderr)
         sys.exit(1)
 
+    # Compile once; every query reuses the bound search instead of re's per-call cache lookup
+    search = re.compile(pattern).search
+
     should_trigger = queries.get("should_trigger", [])
     should_not_trigger = queries.get("should_not_trigger", [])
 
-    matches = []
-    tp, fp, tn, fn = 0, 0, 0, 0
-
-    for query in should_trigger:
-        matched = bool(_re.search(pattern, query.lower()))
-        matches.append({"query": query, "expected": True, "matched": matched, "correct": matched})
-        if matched:
-            tp += 1
-        else:
-            fn += 1
-
-    for query in should_not_trigger:
-        matched = bool(_re.search(pattern, query.lower()))
-        matches.append({"query": query, "expected": False, "matched": matched, "correct": not matched})
-        if matched:
-            fp += 1
-        else:
-            tn += 1
+    # One flag per query, then counts from sums: no per-query counter branches
+    trigger_hits = [search(q.lower()) is not None for q in should_trigger]
+    non_trigger_hits = [search(q.lower()) is not None for q in should_not_trigger]
+    tp = sum(trigger_hits)
+    fn = len(trigger_hits) - tp
+    fp = sum(non_trigger_hits)
+    tn = len(non_trigger_hits) - fp
 
     total = tp + tn + fp + fn
     precision = tp / (tp + fp) if (tp + fp) > 0 else 1.0
     recall = tp / (tp + fn) if (tp + fn) > 0 else 1.0
     f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0.0
 
-    return {
-        "skill": name,
-        "pattern": pattern,
-        "matches": matches,
-        "metrics": {
-            "true_positives": tp, "false_positives": fp,
-            "true_negatives": tn, "false_negatives": fn,
-            "precision": round(precision, 3),
-            "recall": round(recall, 3),
-            "f1": round(f1, 3),
-            "accuracy": round((tp + tn) / total, 3) if total > 0 else 0.0,
-        },
+    report = {"skill": name, "pattern": pattern}
+    if detail:
+        report["matches"] = [
+            {"query": q, "expected": True, "matched": hit, "correct": hit}
+            for q, hit in zip(should_trigger, trigger_hits)
+        ] + [
+            {"query": q, "expected": False, "matched": hit, "correct": not hit}
+            for q, hit in zip(should_not_trigger, non_trigger_hits)
+        ]
+    report["metrics"] = {
+        "true_positives": tp, "false_positives": fp,
+        "true_negatives": tn, "false_negatives": fn,
+        "precision": round(precision, 3),
+        "recall": round(recall, 3),
+        "f1": round(f1, 3),
+        "accuracy": round((tp + tn) / total, 3) if total > 0 else 0.0,
     }
+    return report
 
 
-def ab_eval(name, prompts, models=None, max_tokens=2000):
-    """A/B evaluation: for each prompt x model, run baseline (no skill) and treatment (with skill). Returns paired results."""
+def ab_eval(name, prompts, models=None, max_tokens=2000, concurrency=OPENROUTER_WORKERS, cache_ttl=None,
+            baseline_cache=True, cache_responses=False):
+    """A/B evaluation: for each prompt x model, run baseline (no skill) and treatment (with skill). Returns paired results.
+
+    With cache_ttl, responses are reused from the on-disk cache; baseline_cache=False keeps baselines fresh regardless.
+    Baselines for duplicate prompts share one call unless baseline_cache=False; treatments only with cache_responses.
+    """
     load_env()
     api_key = os.environ.get("OPENROUTER_API_KEY", "")
     if not api_key:
@@ -952,31 +1380,49 @@ def ab_eval(name, prompts, models=None, max_tokens=2000):
         sys.exit(1)
 
     skill_path = GENERATED_DIR / name / "SKILL.md"
-    if not skill_path.exists():
+    try:
+        skill_content = skill_path.read_text()
+    except FileNotFoundError:
         print(f"Error: {skill_path} not found", file=sys.stderr)
         sys.exit(1)
-
-    skill_content = skill_path.read_text()
     models = models or DEFAULT_TEST_MODELS
+    specs = {model: _parse_model_spec(model) for model in models}  # once per model, not per prompt
 
-    pairs = []
-    for model in models:
-        for i, prompt in enumerate(prompts):
-            model_id, provider_slug = _parse_model_spec(model)
-
-            baseline = _openrouter_request(
+    def run(task):
+        model, i, prompt, leg = task
+        model_id, provider_slug = specs[model]
+        if leg == "baseline":
+            result = _openrouter_request(
                 api_key, model_id, provider_slug,
                 [{"role": "user", "content": prompt}],
-                max_tokens,
+                max_tokens, cache_ttl=cache_ttl if baseline_cache else None,
             )
-            treatment = _openrouter_request(
+        else:
+            result = _openrouter_request(
                 api_key, model_id, provider_slug,
                 [{"role": "system", "content": skill_content}, {"role": "user", "content": prompt}],
-                max_tokens,
+                max_tokens, cache_ttl=cache_ttl,
             )
+        _progress(f"  {model} × prompt {i+1} {leg}: {result['status']}")
+        return result
+
+    # Both legs go into one pool so they overlap
+    slots = [(model, i, prompt) for model in models for i, prompt in enumerate(prompts)]
+    tasks = {}
+    for slot in slots:
+        tasks.setdefault((_request_key(*slot, baseline_cache), "baseline"), (*slot, "baseline"))
+        tasks.setdefault((_request_key(*slot, cache_responses), "treatment"), (*slot, "treatment"))
+    with ThreadPoolExecutor(max_workers=max(1, min(len(tasks), concurrency))) as pool:
+        outcomes = dict(zip(tasks, pool.map(run, tasks.values())))
 
-            pairs.append({"model": model, "prompt": prompt, "baseline": baseline, "treatment": treatment})
-            print(f"  {model} × prompt {i+1}: baseline={baseline['status']}, treatment={treatment['status']}", file=sys.stderr)
+    pairs = []
+    for slot in slots:
+        model, _, prompt = slot
+        pairs.append({
+            "model": model, "prompt": prompt,
+            "baseline": outcomes[(_request_key(*slot, baseline_cache), "baseline")],
+            "treatment": outcomes[(_request_key(*slot, cache_responses), "treatment")],
+        })
 
     return {"skill": name, "models": models, "pairs": pairs}
 
@@ -988,13 +1434,21 @@ def cleanup():
         shutil.rmtree(staging_root)
 
 
+def _print_json(obj):
+    """Write obj to stdout as indented JSON, streamed rather than built as one string first."""
+    json.dump(obj, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
 def main():
+    global HTTP_CACHE_ENABLED
     parser = argparse.ArgumentParser(description="Skill distiller helper")
     sub = parser.add_subparsers(dest="command", required=True)
 
     # search
     p_search = sub.add_parser("search", help="Search skills.sh for qualifying skills")
     p_search.add_argument("queries", nargs="+", help="Search queries")
+    p_search.add_argument("--no-cache", action="store_true", help="Bypass the on-disk response cache")
 
     # fetch
     p_fetch = sub.add_parser("fetch", help="Fetch, stage, and checksum skills")
@@ -1003,12 +1457,15 @@ def main():
     # check-updates
     p_check = sub.add_parser("check-updates", help="Check for updates to a generated skill")
     p_check.add_argument("name", help="Skill name (directory under generated-skills/)")
+    p_check.add_argument("--no-cache", action="store_true", help="Bypass the on-disk response cache")
+    p_check.add_argument("--force", action="store_true", help="Re-fetch every source, even if the manifest is recent")
 
     # update-manifest
     p_update = sub.add_parser("update-manifest", help="Update manifest.json")
     p_update.add_argument("name", help="Skill name")
     p_update.add_argument("--token-count", type=int, required=True, help="Estimated token count")
     p_update.add_argument("--sources", required=True, help="JSON array of sources with sha1")
+    p_update.add_argument("--compact", action="store_true", help="Write minified JSON (for machine consumers)")
 
     # token-count
     p_tokens = sub.add_parser("token-count", help="Estimate token count for a file")
@@ -1019,14 +1476,17 @@ def main():
     p_grok.add_argument("topic", help="Topic to search for")
     p_grok.add_argument("--top-installs", type=int, default=1000, help="Highest install count from search results (sets engagement threshold)")
     p_grok.add_argument("--instructions", default=None, help="Scope/exclusion instructions to apply")
+    p_grok.add_argument("--no-cache", action="store_true", help="Bypass the on-disk response cache")
 
     # backfill-sha1
     p_backfill = sub.add_parser("backfill-sha1", help="Fetch sources and add sha1 checksums to manifest")
     p_backfill.add_argument("name", help="Skill name (directory under generated-skills/)")
+    p_backfill.add_argument("--compact", action="store_true", help="Write minified JSON (for machine consumers)")
 
     # validate
     p_validate = sub.add_parser("validate", help="Validate a generated skill")
     p_validate.add_argument("name", help="Skill name (directory under generated-skills/)")
+    p_validate.add_argument("--fail-fast", action="store_true", help="Stop once a second gate fails (the verdict is decided)")
 
     # test
     p_test = sub.add_parser("test", help="Test a skill against multiple models via OpenRouter")
@@ -1034,6 +1494,9 @@ def main():
     p_test.add_argument("--prompts", required=True, help="JSON array of evaluation prompts")
     p_test.add_argument("--models", default=None, help="JSON array of OpenRouter model IDs (optional)")
     p_test.add_argument("--max-tokens", type=int, default=2000, help="Max response tokens per model (default: 2000)")
+    p_test.add_argument("--cache-responses", action="store_true", help="Share one call per model between duplicate prompts")
+    p_test.add_argument("--cache-ttl", type=int, default=None, help="Reuse cached responses up to this many seconds old (skill edits miss the cache)")
+    p_test.add_argument("--concurrency", type=int, default=OPENROUTER_WORKERS, help=f"Max in-flight OpenRouter requests (default: {OPENROUTER_WORKERS})")
 
     # ab-eval
     p_ab = sub.add_parser("ab-eval", help="A/B evaluation: with-skill vs baseline for each prompt x model")
@@ -1041,6 +1504,10 @@ def main():
     p_ab.add_argument("--prompts", required=True, help="JSON array of evaluation prompts")
     p_ab.add_argument("--models", default=None, help="JSON array of OpenRouter model IDs (optional)")
     p_ab.add_argument("--max-tokens", type=int, default=2000, help="Max response tokens per request (default: 2000)")
+    p_ab.add_argument("--cache-ttl", type=int, default=None, help="Reuse cached responses up to this many seconds old (skill edits miss the cache)")
+    p_ab.add_argument("--no-baseline-cache", action="store_true", help="Always re-run baselines (one per listed prompt), even with --cache-ttl")
+    p_ab.add_argument("--cache-responses", action="store_true", help="Share one treatment call per model between duplicate prompts")
+    p_ab.add_argument("--concurrency", type=int, default=OPENROUTER_WORKERS, help=f"Max in-flight OpenRouter requests (default: {OPENROUTER_WORKERS})")
 
     # eval-triggers
     p_eval_trig = sub.add_parser("eval-triggers", help="Test regex trigger patterns against evaluation queries")
@@ -1048,27 +1515,31 @@ def main():
     p_eval_trig.add_argument("--queries", required=True, help='JSON with "should_trigger" and "should_not_trigger" arrays')
     p_eval_trig.add_argument("--pattern", default=None, help="Regex pattern to test (default: read from skill-patterns.sh)")
     p_eval_trig.add_argument("--patterns-file", default=None, help="Path to skill-patterns.sh (default: plugin repo)")
+    p_eval_trig.add_argument("--no-detail", action="store_true", help="Report metrics only, without the per-query matches list")
 
     # cleanup
     sub.add_parser("cleanup", help="Remove staging directory")
 
     args = parser.parse_args()
 
+    if getattr(args, "no_cache", False):
+        HTTP_CACHE_ENABLED = False
+
     if args.command == "search":
         results = search_skills(args.queries)
-        print(json.dumps(results, indent=2))
+        _print_json(results)
 
     elif args.command == "fetch":
         skills_list = json.loads(args.skills)
         results = fetch_skills(skills_list)
-        print(json.dumps(results, indent=2))
+        _print_json(results)
 
     elif args.command == "check-updates":
-        report = check_updates(args.name)
-        print(json.dumps(report, indent=2))
+        report = check_updates(args.name, force=args.force)
+        _print_json(report)
 
     elif args.command == "update-manifest":
-        update_manifest(args.name, args.token_count, args.sources)
+        update_manifest(args.name, args.token_count, args.sources, compact=args.compact)
 
     elif args.command == "token-count":
         count = token_count(args.file)
@@ -1076,31 +1547,33 @@ def main():
 
     elif args.command == "grok-query":
         result = grok_query(args.topic, args.top_installs, args.instructions)
-        print(json.dumps(result, indent=2))
+        _print_json(result)
 
     elif args.command == "backfill-sha1":
-        backfill_sha1(args.name)
+        backfill_sha1(args.name, compact=args.compact)
 
     elif args.command == "validate":
-        report = validate(args.name)
-        print(json.dumps(report, indent=2))
+        report = validate(args.name, fail_fast=args.fail_fast)
+        _print_json(report)
 
     elif args.command == "test":
         prompts = json.loads(args.prompts)
         models = json.loads(args.models) if args.models else None
-        report = test_skill(args.name, prompts, models, args.max_tokens)
-        print(json.dumps(report, indent=2))
+        report = test_skill(args.name, prompts, models, args.max_tokens, args.concurrency, args.cache_ttl,
+                            cache_responses=args.cache_responses)
+        _print_json(report)
 
     elif args.command == "ab-eval":
         prompts = json.loads(args.prompts)
         models = json.loads(args.models) if args.models else None
-        report = ab_eval(args.name, prompts, models, args.max_tokens)
-        print(json.dumps(report, indent=2))
+        report = ab_eval(args.name, prompts, models, args.max_tokens, args.concurrency, args.cache_ttl,
+                         baseline_cache=not args.no_baseline_cache, cache_responses=args.cache_responses)
+        _print_json(report)
 
     elif args.command == "eval-triggers":
         queries = json.loads(args.queries)
-        report = eval_triggers(args.name, queries, args.pattern, args.patterns_file)
-        print(json.dumps(report, indent=2))
+        report = eval_triggers(args.name, queries, args.pattern, args.patterns_file, detail=not args.no_detail)
+        _print_json(report)
 
     elif args.command == "cleanup":
         cleanup()
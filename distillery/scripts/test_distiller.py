@@ -6,6 +6,8 @@ import os
 import subprocess
 import sys
 import tempfile
+import threading
+import time
 from pathlib import Path
 from unittest import mock
 
@@ -22,6 +24,18 @@ import distiller
 # Fixtures
 # ---------------------------------------------------------------------------
 
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Point the HTTP response cache at a per-test directory."""
+    monkeypatch.setattr(distiller, "CACHE_DIR", tmp_path / ".cache")
+
+
+@pytest.fixture(autouse=True)
+def closed_breakers(monkeypatch):
+    """Start every test with no failures recorded against any host."""
+    monkeypatch.setattr(distiller, "_breaker", {})
+
+
 @pytest.fixture
 def tmp_project(tmp_path, monkeypatch):
     """Set up a temporary project directory with distiller paths."""
@@ -34,35 +48,53 @@ def tmp_project(tmp_path, monkeypatch):
     return tmp_path
 
 
+@pytest.fixture(scope="class")
+def grok_key():
+    """Provide GROK_API_KEY once for a whole test class."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("GROK_API_KEY", "test-key")
+        yield
+
+
+@pytest.fixture(scope="class")
+def openrouter_key():
+    """Provide OPENROUTER_API_KEY once for a whole test class."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("OPENROUTER_API_KEY", "test-key")
+        yield
+
+
+# Body needs ~100+ tokens (350+ bytes) to pass "not suspiciously short" check
+_SAMPLE_BODY_LINES = "\n".join(f"- Rule {i}: do pattern-{i} instead of anti-pattern-{i}" for i in range(30))
+_SAMPLE_SKILL_MD = (
+    "---\n"
+    "name: test-skill\n"
+    "description: >-\n"
+    "  This skill should be used when testing the distiller.\n"
+    "---\n\n"
+    "# Test Skill\n\n"
+    "## Section One\n\n"
+    f"{_SAMPLE_BODY_LINES}\n"
+)
+_SAMPLE_MANIFEST_JSON = json.dumps({
+    "query": "test-skill",
+    "search_queries": ["test", "testing"],
+    "generated": "2026-01-01",
+    "token_count": 100,
+    "sources": [
+        {"id": "owner/repo/skill-a", "installs": 500, "sha1": "abc123"},
+        {"id": "owner/repo/skill-b", "installs": 200, "sha1": "def456"},
+    ],
+}, indent=2)
+
+
 @pytest.fixture
 def sample_skill(tmp_project):
     """Create a sample generated skill with manifest."""
     skill_dir = tmp_project / "generated-skills" / "test-skill"
     skill_dir.mkdir()
-    skill_md = skill_dir / "SKILL.md"
-    # Body needs ~100+ tokens (350+ bytes) to pass "not suspiciously short" check
-    body_lines = "\n".join(f"- Rule {i}: do pattern-{i} instead of anti-pattern-{i}" for i in range(30))
-    skill_md.write_text(
-        "---\n"
-        "name: test-skill\n"
-        "description: >-\n"
-        "  This skill should be used when testing the distiller.\n"
-        "---\n\n"
-        "# Test Skill\n\n"
-        "## Section One\n\n"
-        f"{body_lines}\n"
-    )
-    manifest = {
-        "query": "test-skill",
-        "search_queries": ["test", "testing"],
-        "generated": "2026-01-01",
-        "token_count": 100,
-        "sources": [
-            {"id": "owner/repo/skill-a", "installs": 500, "sha1": "abc123"},
-            {"id": "owner/repo/skill-b", "installs": 200, "sha1": "def456"},
-        ],
-    }
-    (skill_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    (skill_dir / "SKILL.md").write_text(_SAMPLE_SKILL_MD)
+    (skill_dir / "manifest.json").write_text(_SAMPLE_MANIFEST_JSON)
     return skill_dir
 
 
@@ -74,15 +106,32 @@ def _make_search_response(skills):
 def _make_skill(sid, installs=500, source=None):
     """Helper to build a skill dict as returned by skills.sh API."""
     parts = sid.split("/")
+    short = parts[-1] if len(parts) >= 3 else sid
     return {
         "id": sid,
-        "skillId": parts[-1] if len(parts) >= 3 else sid,
-        "name": parts[-1] if len(parts) >= 3 else sid,
+        "skillId": short,
+        "name": short,
         "installs": installs,
         "source": source or "/".join(parts[:2]) if len(parts) >= 3 else "",
     }
 
 
+@pytest.fixture(scope="module")
+def ranked_response():
+    """Search response with 15 skills at strictly descending installs (built once per module)."""
+    return _make_search_response([_make_skill(f"a/b/s{i}", 1000 - i) for i in range(15)])
+
+
+def _urlopen_response(body=b'{"ok": true}'):
+    """Helper to build a urlopen() context-manager response whose read() returns body."""
+    # Spec'd to what _http_request touches; a stray attribute access fails loudly
+    resp = mock.NonCallableMock(spec=["read", "__enter__", "__exit__"])
+    resp.read.return_value = body
+    resp.__enter__ = mock.Mock(return_value=resp)
+    resp.__exit__ = mock.Mock(return_value=False)
+    return resp
+
+
 # ---------------------------------------------------------------------------
 # compute_sha1
 # ---------------------------------------------------------------------------
@@ -107,6 +156,46 @@ class TestComputeSha1:
         expected = hashlib.sha1(data).hexdigest()
         assert distiller.compute_sha1(str(f)) == expected
 
+    def test_large_file(self, tmp_path):
+        f = tmp_path / "large.dat"
+        data = os.urandom(10 * (1 << 20) + 3)  # 10 MiB+, well past any single read buffer
+        f.write_bytes(data)
+        assert distiller.compute_sha1(str(f)) == hashlib.sha1(data).hexdigest()
+
+    def test_large_file_hashed_via_mmap(self, tmp_path):
+        f = tmp_path / "mapped.dat"
+        data = os.urandom(distiller.MMAP_HASH_THRESHOLD * 2 + 1)
+        f.write_bytes(data)
+        with mock.patch.object(distiller.mmap, "mmap", wraps=distiller.mmap.mmap) as mapped:
+            assert distiller.compute_sha1(str(f)) == hashlib.sha1(data).hexdigest()
+        assert mapped.call_count == 1
+
+    def test_fallback_without_file_digest(self, tmp_path, monkeypatch):
+        f = tmp_path / "big.dat"
+        data = os.urandom(distiller.HASH_CHUNK_SIZE * 2 + 17)  # spans multiple chunks
+        f.write_bytes(data)
+        monkeypatch.delattr(hashlib, "file_digest", raising=False)
+        monkeypatch.setattr(distiller, "MMAP_HASH_THRESHOLD", float("inf"))  # exercise the read loop
+        assert distiller.compute_sha1(str(f)) == hashlib.sha1(data).hexdigest()
+
+
+class TestComputeDigests:
+    def test_multiple_algorithms_single_read(self, tmp_path, monkeypatch):
+        f = tmp_path / "multi.dat"
+        data = os.urandom(distiller.HASH_CHUNK_SIZE + 5)
+        f.write_bytes(data)
+        monkeypatch.setattr(distiller, "MMAP_HASH_THRESHOLD", float("inf"))  # exercise the read loop
+        result = distiller.compute_digests(str(f), ("sha1", "sha256"))
+        assert result == {
+            "sha1": hashlib.sha1(data).hexdigest(),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        }
+
+    def test_single_algorithm(self, tmp_path):
+        f = tmp_path / "one.md"
+        f.write_text("abc")
+        assert distiller.compute_digests(str(f), ("sha256",)) == {"sha256": hashlib.sha256(b"abc").hexdigest()}
+
 
 # ---------------------------------------------------------------------------
 # token_count
@@ -130,6 +219,12 @@ class TestTokenCount:
         expected = round(len(content.encode("utf-8")) / 3.5)
         assert distiller.token_count(str(f)) == expected
 
+    def test_does_not_read_file(self, tmp_path):
+        f = tmp_path / "big.md"
+        f.write_text("x" * 700)
+        with mock.patch("builtins.open", side_effect=AssertionError("token_count should only stat")):
+            assert distiller.token_count(str(f)) == 200
+
 
 # ---------------------------------------------------------------------------
 # get_engagement_threshold
@@ -197,6 +292,33 @@ class TestLoadEnv:
         # Should not raise
         distiller.load_env()
 
+    def test_whitespace_and_inline_characters(self, tmp_project, monkeypatch):
+        for k in ("SPACED", "HASHED", "INDENTED"):
+            monkeypatch.delenv(k, raising=False)
+        env = tmp_project / ".env"
+        env.write_text("SPACED = two words \r\nHASHED=abc#def\n  INDENTED=yes\nnot a pair\n")
+        distiller.load_env()
+        assert os.environ["SPACED"] == "two words"
+        assert os.environ["HASHED"] == "abc#def"
+        assert os.environ["INDENTED"] == "yes"
+
+    def test_parsed_once_until_changed(self, tmp_project, monkeypatch):
+        monkeypatch.delenv("ONCE_KEY", raising=False)
+        env = tmp_project / ".env"
+        env.write_text("ONCE_KEY=first\n")
+        with mock.patch.object(Path, "read_text", autospec=True, side_effect=Path.read_text) as read:
+            distiller.load_env()
+            monkeypatch.delenv("ONCE_KEY")
+            distiller.load_env()  # cached values are re-applied without re-reading
+            assert os.environ["ONCE_KEY"] == "first"
+            assert read.call_count == 1
+        monkeypatch.delenv("ONCE_KEY")
+        env.write_text("ONCE_KEY=second\n")
+        os.utime(env, ns=(0, 0))  # force a new mtime even on coarse clocks
+        distiller.load_env()
+        assert os.environ["ONCE_KEY"] == "second"
+        monkeypatch.delenv("ONCE_KEY")
+
 
 # ---------------------------------------------------------------------------
 # search_skills
@@ -227,12 +349,19 @@ class TestSearchSkills:
         ids = [r["id"] for r in result]
         assert "a/b/s2" not in ids
 
-    def test_top_10_limit(self):
-        skills = [_make_skill(f"a/b/s{i}", 1000 - i) for i in range(15)]
-        with mock.patch.object(distiller, "_http_request", return_value=_make_search_response(skills)):
+    def test_top_10_limit(self, ranked_response):
+        with mock.patch.object(distiller, "_http_request", return_value=ranked_response):
             result = distiller.search_skills(["test"])
         assert len(result) == 10
 
+    def test_ties_keep_first_seen_order(self):
+        skills = [_make_skill(f"a/b/s{i}", 300 if i % 2 else 500) for i in range(14)]
+        with mock.patch.object(distiller, "_http_request", return_value=_make_search_response(skills)):
+            result = distiller.search_skills(["test"])
+        assert [r["id"] for r in result] == (
+            [f"a/b/s{i}" for i in range(0, 14, 2)] + [f"a/b/s{i}" for i in (1, 3, 5)]
+        )
+
     def test_fallback_threshold(self):
         """When fewer than 3 qualify at >=100, drops to >=50."""
         skills = [
@@ -251,8 +380,16 @@ class TestSearchSkills:
             result = distiller.search_skills(["query1", "query2"])
         assert len(result) == 1
 
+    def test_each_query_requested_once(self):
+        skills = [_make_skill("a/b/s1", 500)]
+        with mock.patch.object(distiller, "_http_request", return_value=_make_search_response(skills)) as mock_http:
+            distiller.search_skills([f"q{i}" for i in range(12)])
+        assert mock_http.call_count == 12
+        urls = sorted(c.args[0] for c in mock_http.call_args_list)
+        assert len(set(urls)) == 12
+
     def test_partial_failure_warns(self):
-        def side_effect(url):
+        def side_effect(url, **kwargs):
             if "fail" in url:
                 raise RuntimeError("boom")
             return _make_search_response([_make_skill("a/b/s1", 500)])
@@ -267,6 +404,45 @@ class TestSearchSkills:
                 distiller.search_skills(["fail1", "fail2"])
 
 
+# ---------------------------------------------------------------------------
+# _cached_http_request
+# ---------------------------------------------------------------------------
+
+class TestCachedHttpRequest:
+    def test_second_call_served_from_cache(self):
+        with mock.patch.object(distiller, "_http_request", return_value={"skills": []}) as mock_http:
+            first = distiller._cached_http_request("https://skills.sh/api/search?q=x")
+            second = distiller._cached_http_request("https://skills.sh/api/search?q=x")
+        assert first == second == {"skills": []}
+        assert mock_http.call_count == 1
+
+    def test_body_is_part_of_key(self):
+        with mock.patch.object(distiller, "_http_request", return_value={"ok": True}) as mock_http:
+            distiller._cached_http_request("https://api.example.com", data=b"a")
+            distiller._cached_http_request("https://api.example.com", data=b"b")
+        assert mock_http.call_count == 2
+
+    def test_expired_entry_refetched(self):
+        with mock.patch.object(distiller, "_http_request", return_value={"ok": True}) as mock_http:
+            distiller._cached_http_request("https://example.com", ttl=0)
+            distiller._cached_http_request("https://example.com", ttl=0)
+        assert mock_http.call_count == 2
+
+    def test_error_responses_not_cached(self):
+        with mock.patch.object(distiller, "_http_request", return_value={"error": "bad"}) as mock_http:
+            distiller._cached_http_request("https://example.com")
+            distiller._cached_http_request("https://example.com")
+        assert mock_http.call_count == 2
+
+    def test_disabled_bypasses_cache(self, monkeypatch):
+        monkeypatch.setattr(distiller, "HTTP_CACHE_ENABLED", False)
+        with mock.patch.object(distiller, "_http_request", return_value={"ok": True}) as mock_http:
+            distiller._cached_http_request("https://example.com")
+            distiller._cached_http_request("https://example.com")
+        assert mock_http.call_count == 2
+        assert not distiller.CACHE_DIR.exists()
+
+
 # ---------------------------------------------------------------------------
 # _resolve_moved_skill
 # ---------------------------------------------------------------------------
@@ -340,6 +516,13 @@ class TestStageSkill:
 
         assert not (symlink_dir / "my-skill").exists()
 
+    def test_removes_copied_directory(self, tmp_project):
+        copy_dir = tmp_project / ".claude" / "skills" / "my-skill"
+        copy_dir.mkdir(parents=True)
+        (copy_dir / "SKILL.md").write_text("copy")
+        distiller._stage_skill("my-skill")
+        assert not copy_dir.exists()
+
     def test_overwrites_existing_staging(self, tmp_project):
         staging = tmp_project / ".skill-distiller" / "sources"
         staging.mkdir(parents=True)
@@ -355,6 +538,83 @@ class TestStageSkill:
 
         assert (staging / "my-skill" / "SKILL.md").read_text() == "new"
         assert not (staging / "my-skill" / "OLD.md").exists()
+        assert not (staging / "my-skill.stale").exists()
+
+    def test_creates_staging_parent(self, tmp_project):
+        agent_dir = tmp_project / ".agents" / "skills" / "my-skill"
+        agent_dir.mkdir(parents=True)
+        (agent_dir / "SKILL.md").write_text("content")
+
+        distiller._stage_skill("my-skill")
+
+        assert (tmp_project / ".skill-distiller" / "sources" / "my-skill" / "SKILL.md").exists()
+
+    def test_cross_device_falls_back_to_move(self, tmp_project):
+        staging = tmp_project / ".skill-distiller" / "sources"
+        staging.mkdir(parents=True)
+        agent_dir = tmp_project / ".agents" / "skills" / "my-skill"
+        agent_dir.mkdir(parents=True)
+        (agent_dir / "SKILL.md").write_text("content")
+
+        with mock.patch("os.replace", side_effect=OSError(distiller.errno.EXDEV, "cross-device")):
+            distiller._stage_skill("my-skill")
+
+        assert not agent_dir.exists()
+        assert (staging / "my-skill" / "SKILL.md").read_text() == "content"
+
+    def test_failed_move_restores_previous_copy(self, tmp_project):
+        staging = tmp_project / ".skill-distiller" / "sources"
+        (staging / "my-skill").mkdir(parents=True)
+        (staging / "my-skill" / "SKILL.md").write_text("old")
+        agent_dir = tmp_project / ".agents" / "skills" / "my-skill"
+        agent_dir.mkdir(parents=True)
+        (agent_dir / "SKILL.md").write_text("new")
+
+        real_replace = os.replace
+        def fail_move_in(src, dst):
+            if Path(src) == agent_dir:
+                raise PermissionError("denied")
+            real_replace(src, dst)
+
+        with mock.patch("os.replace", side_effect=fail_move_in):
+            with pytest.raises(PermissionError):
+                distiller._stage_skill("my-skill")
+
+        assert (staging / "my-skill" / "SKILL.md").read_text() == "old"
+        assert not (staging / "my-skill.stale").exists()
+
+
+# ---------------------------------------------------------------------------
+# _cleanup_fetch_artifacts
+# ---------------------------------------------------------------------------
+
+class TestCleanupFetchArtifacts:
+    def test_removes_agent_entries_and_empty_dirs(self, tmp_project):
+        agents = tmp_project / ".agents" / "skills"
+        (agents / "leftover").mkdir(parents=True)
+        (agents / "leftover" / "SKILL.md").write_text("x")
+        (agents / "stray.txt").write_text("x")
+
+        distiller._cleanup_fetch_artifacts()
+
+        assert not (tmp_project / ".agents").exists()
+
+    def test_removes_only_symlinks_into_agents(self, tmp_project):
+        agents = tmp_project / ".agents" / "skills"
+        (agents / "a").mkdir(parents=True)
+        links = tmp_project / ".claude" / "skills"
+        links.mkdir(parents=True)
+        (links / "into-agents").symlink_to(agents / "a")
+        other = tmp_project / "elsewhere"
+        other.mkdir()
+        (links / "unrelated").symlink_to(other)
+        (links / "real-dir").mkdir()
+
+        distiller._cleanup_fetch_artifacts()
+
+        assert not (links / "into-agents").is_symlink()
+        assert (links / "unrelated").is_symlink()
+        assert (links / "real-dir").is_dir()
 
 
 # ---------------------------------------------------------------------------
@@ -386,6 +646,51 @@ class TestFetchSkills:
         assert "sha1" in results[0]
         assert results[0]["sha1"] == hashlib.sha1(content.encode()).hexdigest()
 
+    @mock.patch.object(distiller, "_check_npx_skills")
+    @mock.patch("subprocess.run")
+    def test_checksums_follow_input_order(self, mock_run, mock_check, tmp_project):
+        names = [f"skill-{i}" for i in range(5)]
+        def run_side_effect(cmd, **kwargs):
+            for n in names:
+                if n in cmd:
+                    self._make_agent_skill(tmp_project, n, f"# {n}")
+            return mock.Mock(returncode=0)
+
+        mock_run.side_effect = run_side_effect
+        skills = [{"id": f"o{i}/repo/{n}", "skillId": n, "installs": 100, "source": f"o{i}/repo"} for i, n in enumerate(names)]
+        results = distiller.fetch_skills(skills)
+
+        assert [r["skillId"] for r in results] == names
+        for r, n in zip(results, names):
+            assert r["sha1"] == hashlib.sha1(f"# {n}".encode()).hexdigest()
+
+    @mock.patch.object(distiller, "_check_npx_skills")
+    @mock.patch("subprocess.run")
+    def test_clean_stage_skips_artifact_sweep(self, mock_run, mock_check, tmp_project):
+        def run_side_effect(cmd, **kwargs):
+            self._make_agent_skill(tmp_project, "skill-a")
+            return mock.Mock(returncode=0)
+
+        mock_run.side_effect = run_side_effect
+        skills = [{"id": "owner/repo/skill-a", "skillId": "skill-a", "installs": 500, "source": "owner/repo"}]
+        with mock.patch.object(distiller, "_cleanup_fetch_artifacts") as mock_sweep:
+            distiller.fetch_skills(skills)
+        mock_sweep.assert_not_called()
+        assert not (tmp_project / ".agents").exists()
+
+    @mock.patch.object(distiller, "_check_npx_skills")
+    @mock.patch("subprocess.run")
+    def test_residue_triggers_artifact_sweep(self, mock_run, mock_check, tmp_project):
+        def run_side_effect(cmd, **kwargs):
+            self._make_agent_skill(tmp_project, "skill-a")
+            self._make_agent_skill(tmp_project, "owner:skill-a")  # unexpected extra dir
+            return mock.Mock(returncode=0)
+
+        mock_run.side_effect = run_side_effect
+        skills = [{"id": "owner/repo/skill-a", "skillId": "skill-a", "installs": 500, "source": "owner/repo"}]
+        distiller.fetch_skills(skills)
+        assert not (tmp_project / ".agents").exists()
+
     @mock.patch.object(distiller, "_check_npx_skills")
     @mock.patch.object(distiller, "_resolve_moved_skill", return_value=None)
     @mock.patch("subprocess.run", side_effect=subprocess.CalledProcessError(1, "npx", stderr="fail"))
@@ -419,6 +724,26 @@ class TestFetchSkills:
 
         assert mock_run.call_count == 2  # two source groups
 
+    @mock.patch.object(distiller, "_check_npx_skills")
+    @mock.patch("subprocess.run")
+    def test_source_groups_installed_one_at_a_time(self, mock_run, mock_check, tmp_project):
+        running = []
+        overlapped = []
+        def run_side_effect(cmd, **kwargs):
+            running.append(cmd)
+            overlapped.append(len(running) > 1)
+            time.sleep(0.01)
+            running.remove(cmd)
+            return mock.Mock(returncode=0)
+        mock_run.side_effect = run_side_effect
+        skills = [
+            {"id": "owner/repo/skill-a", "skillId": "skill-a", "installs": 500, "source": "owner/repo"},
+            {"id": "other/repo/skill-c", "skillId": "skill-c", "installs": 200, "source": "other/repo"},
+        ]
+        distiller.fetch_skills(skills)
+        assert mock_run.call_count == 2
+        assert not any(overlapped)
+
     @mock.patch.object(distiller, "_check_npx_skills")
     @mock.patch("subprocess.run")
     def test_resolve_on_failure(self, mock_run, mock_check, tmp_project):
@@ -445,6 +770,35 @@ class TestFetchSkills:
         assert len(ok) == 1
         assert ok[0]["id"] == "owner/new-repo/skill-a"  # updated
 
+    @mock.patch.object(distiller, "_check_npx_skills")
+    @mock.patch("subprocess.run")
+    def test_multiple_retries_partial_failure(self, mock_run, mock_check, tmp_project):
+        """Retries for several moved skills run independently; one failing doesn't block the others."""
+        def run_side_effect(cmd, **kwargs):
+            if "https://github.com/owner/old-repo" in cmd or "skill-b" in cmd:
+                raise subprocess.CalledProcessError(1, "npx", stderr="not found")
+            self._make_agent_skill(tmp_project, "skill-a", "# A")
+            return mock.Mock(returncode=0)
+
+        mock_run.side_effect = run_side_effect
+
+        def resolve(old_id):
+            name = old_id.split("/")[-1]
+            return {"id": f"owner/new-repo/{name}", "source": "owner/new-repo", "installs": 600}
+
+        with mock.patch.object(distiller, "_resolve_moved_skill", side_effect=resolve):
+            skills = [
+                {"id": "owner/old-repo/skill-a", "skillId": "skill-a", "installs": 500, "source": "owner/old-repo"},
+                {"id": "owner/old-repo/skill-b", "skillId": "skill-b", "installs": 400, "source": "owner/old-repo"},
+            ]
+            results = distiller.fetch_skills(skills)
+
+        assert mock_run.call_count == 3  # group fetch + two retries
+        ok = [r for r in results if "sha1" in r]
+        failed = [r for r in results if r.get("status") == "fetch_failed"]
+        assert [r["id"] for r in ok] == ["owner/new-repo/skill-a"]
+        assert [r["id"] for r in failed] == ["owner/old-repo/skill-b"]
+
 
 # ---------------------------------------------------------------------------
 # update_manifest
@@ -473,6 +827,17 @@ class TestUpdateManifest:
         with pytest.raises(SystemExit):
             distiller.update_manifest("nonexistent", 100, "[]")
 
+    def test_write_leaves_no_temp_file(self, sample_skill):
+        distiller.update_manifest("test-skill", 100, "[]")
+        assert [p.name for p in sample_skill.glob("manifest*")] == ["manifest.json"]
+        assert (sample_skill / "manifest.json").read_text().startswith("{\n  ")
+
+    def test_compact(self, sample_skill):
+        distiller.update_manifest("test-skill", 100, "[]", compact=True)
+        text = (sample_skill / "manifest.json").read_text()
+        assert text.count("\n") == 1
+        assert json.loads(text)["token_count"] == 100
+
 
 # ---------------------------------------------------------------------------
 # validate
@@ -524,6 +889,58 @@ class TestValidate:
         assert result["gates"]["name"]["pass"] is False
         assert any("Missing name" in i for i in result["issues"])
 
+    def test_fail_fast_stops_once_verdict_decided(self, tmp_project):
+        skill_dir = tmp_project / "generated-skills" / "bare"
+        skill_dir.mkdir()
+        (skill_dir / "SKILL.md").write_text("---\nlicense: MIT\n---\n\n# Content\n\n" + "word " * 200)
+        result = distiller.validate("bare", fail_fast=True)
+        assert list(result["gates"]) == ["frontmatter", "name"]
+        assert result["passed"] is False
+        assert result["max_score"] == 7
+        assert result["issues"] == ["Inert fields: license", "Missing name"]
+
+    def test_fail_fast_total_tokens_include_references(self, tmp_project):
+        skill_dir = tmp_project / "generated-skills" / "bare"
+        (skill_dir / "references").mkdir(parents=True)
+        (skill_dir / "SKILL.md").write_text("---\nlicense: MIT\n---\n\n# Content\n\n" + "word " * 200)
+        (skill_dir / "references" / "extra.md").write_text("x" * 700)
+        result = distiller.validate("bare", fail_fast=True)
+        assert len(result["gates"]) == 2
+        assert result["total_tokens"] == result["body_tokens"] + 200
+
+    def test_fail_fast_single_failure_keeps_full_verdict(self, tmp_project):
+        skill_dir = tmp_project / "generated-skills" / "no-name"
+        skill_dir.mkdir()
+        (skill_dir / "SKILL.md").write_text(
+            "---\ndescription: A description.\n---\n\n# Content\n\n" + "word " * 200
+        )
+        (skill_dir / "manifest.json").write_text('{"search_queries":["a"],"sources":[{"id":"a/b/c","sha1":"x"}]}')
+        result = distiller.validate("no-name", fail_fast=True)
+        assert len(result["gates"]) == 7
+        assert result["passed"] is True
+        assert result == distiller.validate("no-name")
+
+    def test_unchanged_skill_served_from_cache(self, sample_skill):
+        first = distiller.validate("test-skill")
+        first["issues"].append("caller mutation")
+        with mock.patch.object(distiller, "_validate_uncached") as run:
+            second = distiller.validate("test-skill")
+        run.assert_not_called()
+        assert second["issues"] == []
+
+    def test_cache_invalidated_by_edits(self, sample_skill):
+        assert distiller.validate("test-skill")["gates"]["no_placeholders"]["pass"] is True
+        skill_md = sample_skill / "SKILL.md"
+        skill_md.write_text(skill_md.read_text() + "\nTBD\n")
+        assert distiller.validate("test-skill")["gates"]["no_placeholders"]["pass"] is False
+        refs = sample_skill / "references"
+        refs.mkdir(exist_ok=True)
+        (refs / "big.md").write_text("x" * 8000)
+        assert any("big.md" in i for i in distiller.validate("test-skill")["issues"])
+
+    def test_fail_fast_matches_full_run_when_clean(self, sample_skill):
+        assert distiller.validate("test-skill", fail_fast=True) == distiller.validate("test-skill")
+
     def test_missing_description(self, tmp_project):
         skill_dir = tmp_project / "generated-skills" / "no-desc"
         skill_dir.mkdir()
@@ -565,6 +982,22 @@ class TestValidate:
         result = distiller.validate("banned")
         assert result["gates"]["name"]["pass"] is False
 
+    def test_invalid_yaml_reported(self, tmp_project):
+        skill_dir = tmp_project / "generated-skills" / "bad-yaml"
+        skill_dir.mkdir()
+        (skill_dir / "SKILL.md").write_text(
+            "---\nname: [unclosed\n---\n\n# Content\n\n" + "word " * 200
+        )
+        result = distiller.validate("bad-yaml")
+        assert result["gates"]["frontmatter"]["pass"] is False
+        assert "Invalid YAML" in result["gates"]["frontmatter"]["detail"]
+
+    def test_pure_python_loader_fallback(self, sample_skill, monkeypatch):
+        import yaml
+        monkeypatch.delattr(yaml, "CSafeLoader", raising=False)
+        result = distiller.validate("test-skill")
+        assert result["valid"] is True
+
     def test_inert_fields_flagged(self, tmp_project):
         skill_dir = tmp_project / "generated-skills" / "inert"
         skill_dir.mkdir()
@@ -618,6 +1051,16 @@ class TestValidate:
         result = distiller.validate("second")
         assert any("Second person" in w for w in result["warnings"])
 
+    def test_utf8_body_counted_in_bytes(self, tmp_project):
+        skill_dir = tmp_project / "generated-skills" / "utf8"
+        skill_dir.mkdir()
+        body = "# Content\n\n" + "Never inline secrets — load them from env. 🎉\n" * 20
+        (skill_dir / "SKILL.md").write_text("---\nname: utf8\ndescription: Short.\n---\n\n" + body, encoding="utf-8")
+        (skill_dir / "manifest.json").write_text('{"search_queries":["a"],"sources":[{"id":"a/b/c","sha1":"x"}]}')
+        result = distiller.validate("utf8")
+        assert result["body_tokens"] == round(len(body.strip().encode("utf-8")) / 3.5)
+        assert not any("naked negations" in w for w in result["warnings"])
+
     def test_missing_search_queries_in_manifest(self, tmp_project):
         skill_dir = tmp_project / "generated-skills" / "no-sq"
         skill_dir.mkdir()
@@ -654,6 +1097,22 @@ class TestValidate:
         result = distiller.validate("with-refs")
         assert result["total_tokens"] > result["body_tokens"]
 
+    def test_oversized_reference_is_issue(self, tmp_project):
+        skill_dir = tmp_project / "generated-skills" / "big-ref"
+        skill_dir.mkdir()
+        (skill_dir / "SKILL.md").write_text(
+            "---\nname: big-ref\ndescription: Short.\n---\n\n# Content\n\n" + "word " * 200
+        )
+        refs = skill_dir / "references"
+        refs.mkdir()
+        (refs / "huge.md").write_text("x" * 7700)  # ~2200 tokens
+        (refs / "notes.txt").write_text("x" * 7700)  # not markdown, ignored
+        (skill_dir / "manifest.json").write_text('{"search_queries":["a"],"sources":[{"id":"a/b/c","sha1":"x"}]}')
+        result = distiller.validate("big-ref")
+        assert any("huge.md exceeds 2K" in i for i in result["issues"])
+        assert not any("notes.txt" in i for i in result["issues"])
+        assert result["total_tokens"] == result["body_tokens"] + 2200
+
     def test_placeholder_text_detected(self, tmp_project):
         skill_dir = tmp_project / "generated-skills" / "placeholder"
         skill_dir.mkdir()
@@ -665,6 +1124,39 @@ class TestValidate:
         result = distiller.validate("placeholder")
         assert result["gates"]["no_placeholders"]["pass"] is False
 
+    def test_placeholder_hits_counted_across_patterns(self, tmp_project):
+        skill_dir = tmp_project / "generated-skills" / "many-ph"
+        skill_dir.mkdir()
+        (skill_dir / "SKILL.md").write_text(
+            "---\nname: many-ph\ndescription: Short.\n---\n\n# Content\n\n"
+            "Use <your-key> here, FIXME later, and [INSERT value]. " + "word " * 200
+        )
+        (skill_dir / "manifest.json").write_text('{"search_queries":["a"],"sources":[{"id":"a/b/c","sha1":"x"}]}')
+        result = distiller.validate("many-ph")
+        assert "Found 3 placeholder(s)" in result["gates"]["no_placeholders"]["detail"]
+
+    def test_placeholders_and_second_person_counted_in_one_body(self, tmp_project):
+        skill_dir = tmp_project / "generated-skills" / "mixed"
+        skill_dir.mkdir()
+        (skill_dir / "SKILL.md").write_text(
+            "---\nname: mixed\ndescription: Short.\n---\n\n# Content\n\n"
+            "You should set [YOUR key], then you must run it. TBD: you can skip. " + "word " * 200
+        )
+        (skill_dir / "manifest.json").write_text('{"search_queries":["a"],"sources":[{"id":"a/b/c","sha1":"x"}]}')
+        result = distiller.validate("mixed")
+        assert "Found 2 placeholder(s)" in result["gates"]["no_placeholders"]["detail"]
+        assert any("Second person found (3x)" in w for w in result["warnings"])
+
+    def test_trailing_empty_section_detected(self, tmp_project):
+        skill_dir = tmp_project / "generated-skills" / "trailing"
+        skill_dir.mkdir()
+        (skill_dir / "SKILL.md").write_text(
+            "---\nname: trailing\ndescription: Short.\n---\n\n# Content\n\n" + "word " * 200 + "\n\n## Dangling\n\n\n"
+        )
+        (skill_dir / "manifest.json").write_text('{"search_queries":["a"],"sources":[{"id":"a/b/c","sha1":"x"}]}')
+        result = distiller.validate("trailing")
+        assert "## Dangling" in result["gates"]["completeness"]["detail"]
+
     def test_empty_section_detected(self, tmp_project):
         skill_dir = tmp_project / "generated-skills" / "empty-sec"
         skill_dir.mkdir()
@@ -696,71 +1188,74 @@ class TestValidate:
 # check_updates
 # ---------------------------------------------------------------------------
 
+# Search hits and fetch results matching sample_skill's manifest (sha1 abc123 / def456)
+_SEARCH_A = {"id": "owner/repo/skill-a", "skillId": "skill-a", "installs": 500, "source": "owner/repo"}
+_SEARCH_B = {"id": "owner/repo/skill-b", "skillId": "skill-b", "installs": 200, "source": "owner/repo"}
+_SEARCH_C = {"id": "new/repo/skill-c", "skillId": "skill-c", "installs": 300, "source": "new/repo"}
+_FETCH_A = {"id": "owner/repo/skill-a", "skillId": "skill-a", "installs": 500, "sha1": "abc123", "path": "p1"}
+_FETCH_B = {"id": "owner/repo/skill-b", "skillId": "skill-b", "installs": 200, "sha1": "def456", "path": "p2"}
+_FETCH_C = {"id": "new/repo/skill-c", "skillId": "skill-c", "installs": 300, "sha1": "new111", "path": "p3"}
+
+
 class TestCheckUpdates:
-    @mock.patch.object(distiller, "cleanup")
-    @mock.patch.object(distiller, "fetch_skills")
-    @mock.patch.object(distiller, "search_skills")
-    def test_no_updates(self, mock_search, mock_fetch, mock_cleanup, sample_skill):
-        mock_search.return_value = [
-            {"id": "owner/repo/skill-a", "skillId": "skill-a", "installs": 500, "source": "owner/repo"},
-            {"id": "owner/repo/skill-b", "skillId": "skill-b", "installs": 200, "source": "owner/repo"},
-        ]
-        mock_fetch.return_value = [
-            {"id": "owner/repo/skill-a", "skillId": "skill-a", "installs": 500, "sha1": "abc123", "path": "p1"},
-            {"id": "owner/repo/skill-b", "skillId": "skill-b", "installs": 200, "sha1": "def456", "path": "p2"},
-        ]
+    @pytest.fixture
+    def mocks(self):
+        with mock.patch.multiple(distiller, cleanup=mock.DEFAULT, fetch_skills=mock.DEFAULT,
+                                 search_skills=mock.DEFAULT) as patched:
+            yield patched
+
+    @pytest.mark.parametrize("search, fetched, force, status, bucket, field, value", [
+        ([_SEARCH_A, _SEARCH_B], [_FETCH_A, _FETCH_B], False, "no_updates", None, None, None),
+        (
+            [_SEARCH_A, _SEARCH_B], [{**_FETCH_A, "sha1": "NEW_SHA"}, _FETCH_B],
+            True, "updates_available", "changed", "new_sha1", "NEW_SHA",
+        ),
+        (
+            [_SEARCH_A, _SEARCH_B, _SEARCH_C], [_FETCH_A, _FETCH_B, _FETCH_C],
+            False, "updates_available", "new", "id", "new/repo/skill-c",
+        ),
+        # Only skill-a comes back from search, skill-b was removed
+        ([_SEARCH_A], [_FETCH_A], False, "updates_available", "removed", "id", "owner/repo/skill-b"),
+    ], ids=["no_updates", "changed_source", "new_source", "removed_source"])
+    def test_source_diff(self, mocks, sample_skill, search, fetched, force, status, bucket, field, value):
+        mocks["search_skills"].return_value = search
+        mocks["fetch_skills"].return_value = fetched
+        result = distiller.check_updates("test-skill", force=force)
+        assert result["status"] == status
+        if bucket:
+            assert [entry[field] for entry in result[bucket]] == [value]
+        # Staged sources are only discarded when there is nothing to regenerate from
+        assert mocks["cleanup"].call_count == (status == "no_updates")
+
+    def test_removed_sources_in_manifest_order(self, mocks, sample_skill):
+        mocks["search_skills"].return_value = []
+        mocks["fetch_skills"].return_value = []
         result = distiller.check_updates("test-skill")
-        assert result["status"] == "no_updates"
-        mock_cleanup.assert_called_once()
+        assert [r["id"] for r in result["removed"]] == ["owner/repo/skill-a", "owner/repo/skill-b"]
 
-    @mock.patch.object(distiller, "fetch_skills")
-    @mock.patch.object(distiller, "search_skills")
-    def test_changed_source(self, mock_search, mock_fetch, sample_skill):
-        mock_search.return_value = [
-            {"id": "owner/repo/skill-a", "skillId": "skill-a", "installs": 500, "source": "owner/repo"},
-            {"id": "owner/repo/skill-b", "skillId": "skill-b", "installs": 200, "source": "owner/repo"},
-        ]
-        mock_fetch.return_value = [
-            {"id": "owner/repo/skill-a", "skillId": "skill-a", "installs": 500, "sha1": "NEW_SHA", "path": "p1"},
-            {"id": "owner/repo/skill-b", "skillId": "skill-b", "installs": 200, "sha1": "def456", "path": "p2"},
-        ]
+    def test_recent_manifest_skips_fetch(self, mocks, sample_skill):
+        mocks["search_skills"].return_value = [_SEARCH_A, _SEARCH_B]
         result = distiller.check_updates("test-skill")
-        assert result["status"] == "updates_available"
-        assert len(result["changed"]) == 1
-        assert result["changed"][0]["new_sha1"] == "NEW_SHA"
+        assert result["status"] == "no_updates"
+        mocks["fetch_skills"].assert_not_called()
 
-    @mock.patch.object(distiller, "fetch_skills")
-    @mock.patch.object(distiller, "search_skills")
-    def test_new_source(self, mock_search, mock_fetch, sample_skill):
-        mock_search.return_value = [
-            {"id": "owner/repo/skill-a", "skillId": "skill-a", "installs": 500, "source": "owner/repo"},
-            {"id": "owner/repo/skill-b", "skillId": "skill-b", "installs": 200, "source": "owner/repo"},
-            {"id": "new/repo/skill-c", "skillId": "skill-c", "installs": 300, "source": "new/repo"},
-        ]
-        mock_fetch.return_value = [
-            {"id": "owner/repo/skill-a", "skillId": "skill-a", "installs": 500, "sha1": "abc123", "path": "p1"},
-            {"id": "owner/repo/skill-b", "skillId": "skill-b", "installs": 200, "sha1": "def456", "path": "p2"},
-            {"id": "new/repo/skill-c", "skillId": "skill-c", "installs": 300, "sha1": "new111", "path": "p3"},
-        ]
+    def test_installs_change_triggers_fetch(self, mocks, sample_skill):
+        mocks["search_skills"].return_value = [{**_SEARCH_A, "installs": 900}, _SEARCH_B]
+        mocks["fetch_skills"].return_value = [{**_FETCH_A, "installs": 900, "sha1": "NEW_SHA"}]
         result = distiller.check_updates("test-skill")
-        assert result["status"] == "updates_available"
-        assert len(result["new"]) == 1
-        assert result["new"][0]["id"] == "new/repo/skill-c"
-
-    @mock.patch.object(distiller, "fetch_skills")
-    @mock.patch.object(distiller, "search_skills")
-    def test_removed_source(self, mock_search, mock_fetch, sample_skill):
-        # Only skill-a comes back from search, skill-b was removed
-        mock_search.return_value = [
-            {"id": "owner/repo/skill-a", "skillId": "skill-a", "installs": 500, "source": "owner/repo"},
-        ]
-        mock_fetch.return_value = [
-            {"id": "owner/repo/skill-a", "skillId": "skill-a", "installs": 500, "sha1": "abc123", "path": "p1"},
-        ]
+        fetched_ids = [s["id"] for s in mocks["fetch_skills"].call_args[0][0]]
+        assert fetched_ids == ["owner/repo/skill-a"]
+        assert [c["id"] for c in result["changed"]] == ["owner/repo/skill-a"]
+        assert [u["id"] for u in result["unchanged"]] == ["owner/repo/skill-b"]
+
+    def test_stale_manifest_fetches_everything(self, mocks, sample_skill):
+        old = time.time() - distiller.RECHECK_AFTER - 60
+        os.utime(sample_skill / "manifest.json", (old, old))
+        mocks["search_skills"].return_value = [_SEARCH_A, _SEARCH_B]
+        mocks["fetch_skills"].return_value = [{**_FETCH_A, "sha1": "NEW_SHA"}, _FETCH_B]
         result = distiller.check_updates("test-skill")
-        assert result["status"] == "updates_available"
-        assert len(result["removed"]) == 1
-        assert result["removed"][0]["id"] == "owner/repo/skill-b"
+        assert len(mocks["fetch_skills"].call_args[0][0]) == 2
+        assert result["changed"][0]["new_sha1"] == "NEW_SHA"
 
 
 # ---------------------------------------------------------------------------
@@ -768,9 +1263,12 @@ class TestCheckUpdates:
 # ---------------------------------------------------------------------------
 
 class TestBackfillSha1:
-    @mock.patch.object(distiller, "cleanup")
-    @mock.patch.object(distiller, "fetch_skills")
-    def test_backfills_missing(self, mock_fetch, mock_cleanup, tmp_project):
+    @pytest.fixture
+    def mocks(self):
+        with mock.patch.multiple(distiller, cleanup=mock.DEFAULT, fetch_skills=mock.DEFAULT) as patched:
+            yield patched
+
+    def test_backfills_missing(self, mocks, tmp_project):
         skill_dir = tmp_project / "generated-skills" / "bf-test"
         skill_dir.mkdir()
         manifest = {
@@ -783,7 +1281,7 @@ class TestBackfillSha1:
         }
         (skill_dir / "manifest.json").write_text(json.dumps(manifest))
 
-        mock_fetch.return_value = [
+        mocks["fetch_skills"].return_value = [
             {"id": "a/b/s2", "skillId": "s2", "installs": 200, "sha1": "new_sha"},
         ]
 
@@ -792,9 +1290,7 @@ class TestBackfillSha1:
         assert updated["sources"][0]["sha1"] == "existing"
         assert updated["sources"][1]["sha1"] == "new_sha"
 
-    @mock.patch.object(distiller, "cleanup")
-    @mock.patch.object(distiller, "fetch_skills")
-    def test_skips_if_all_have_sha1(self, mock_fetch, mock_cleanup, tmp_project):
+    def test_skips_if_all_have_sha1(self, mocks, tmp_project):
         skill_dir = tmp_project / "generated-skills" / "complete"
         skill_dir.mkdir()
         manifest = {
@@ -807,11 +1303,9 @@ class TestBackfillSha1:
         (skill_dir / "manifest.json").write_text(json.dumps(manifest))
 
         distiller.backfill_sha1("complete")
-        mock_fetch.assert_not_called()
+        mocks["fetch_skills"].assert_not_called()
 
-    @mock.patch.object(distiller, "cleanup")
-    @mock.patch.object(distiller, "fetch_skills")
-    def test_handles_fetch_failure(self, mock_fetch, mock_cleanup, tmp_project):
+    def test_handles_fetch_failure(self, mocks, tmp_project):
         skill_dir = tmp_project / "generated-skills" / "fail-bf"
         skill_dir.mkdir()
         manifest = {
@@ -823,7 +1317,7 @@ class TestBackfillSha1:
         }
         (skill_dir / "manifest.json").write_text(json.dumps(manifest))
 
-        mock_fetch.return_value = [
+        mocks["fetch_skills"].return_value = [
             {"id": "a/b/s1", "status": "fetch_failed", "error": "gone"},
         ]
 
@@ -857,11 +1351,7 @@ class TestCleanup:
 class TestHttpRequest:
     @mock.patch("urllib.request.urlopen")
     def test_success(self, mock_urlopen):
-        mock_resp = mock.MagicMock()
-        mock_resp.read.return_value = b'{"ok": true}'
-        mock_resp.__enter__ = mock.Mock(return_value=mock_resp)
-        mock_resp.__exit__ = mock.Mock(return_value=False)
-        mock_urlopen.return_value = mock_resp
+        mock_urlopen.return_value = _urlopen_response()
 
         result = distiller._http_request("https://example.com/api", retries=0)
         assert result == {"ok": True}
@@ -870,11 +1360,7 @@ class TestHttpRequest:
     @mock.patch("urllib.request.urlopen")
     def test_retries_on_429(self, mock_urlopen, mock_sleep):
         error = urllib.error.HTTPError("url", 429, "rate limited", {}, None)
-        mock_resp = mock.MagicMock()
-        mock_resp.read.return_value = b'{"ok": true}'
-        mock_resp.__enter__ = mock.Mock(return_value=mock_resp)
-        mock_resp.__exit__ = mock.Mock(return_value=False)
-
+        mock_resp = _urlopen_response()
         mock_urlopen.side_effect = [error, mock_resp]
         result = distiller._http_request("https://example.com/api", retries=1)
         assert result == {"ok": True}
@@ -893,27 +1379,140 @@ class TestHttpRequest:
     @mock.patch("time.sleep")
     @mock.patch("urllib.request.urlopen")
     def test_retries_on_timeout(self, mock_urlopen, mock_sleep):
-        mock_resp = mock.MagicMock()
-        mock_resp.read.return_value = b'{"ok": true}'
-        mock_resp.__enter__ = mock.Mock(return_value=mock_resp)
-        mock_resp.__exit__ = mock.Mock(return_value=False)
-
+        mock_resp = _urlopen_response()
         mock_urlopen.side_effect = [TimeoutError("timed out"), mock_resp]
         result = distiller._http_request("https://example.com/api", retries=1)
         assert result == {"ok": True}
 
+    @mock.patch("time.sleep")
+    @mock.patch("urllib.request.urlopen")
+    def test_honors_retry_after(self, mock_urlopen, mock_sleep):
+        error = urllib.error.HTTPError("url", 429, "rate limited", {"Retry-After": "7"}, None)
+        mock_resp = _urlopen_response()
+        mock_urlopen.side_effect = [error, mock_resp]
+        distiller._http_request("https://example.com/api", retries=1)
+        assert mock_sleep.call_args[0][0] >= 7.0
+
+    @mock.patch("time.sleep")
+    @mock.patch("urllib.request.urlopen")
+    def test_gives_up_on_retry_after_beyond_cap(self, mock_urlopen, mock_sleep):
+        error = urllib.error.HTTPError("url", 429, "rate limited", {"Retry-After": "86400"}, None)
+        mock_urlopen.side_effect = [error, _urlopen_response()]
+        with pytest.raises(RuntimeError, match="Retry-After 86400 exceeds"):
+            distiller._http_request("https://example.com/api", retries=3)
+        assert mock_urlopen.call_count == 1
+        mock_sleep.assert_not_called()
+
+
+class TestCircuitBreaker:
+    @mock.patch("time.sleep")
+    @mock.patch("urllib.request.urlopen")
+    def test_circuit_breaker_short_circuits(self, mock_urlopen, mock_sleep):
+        mock_urlopen.side_effect = urllib.error.URLError("down")
+        with pytest.raises(RuntimeError, match="Connection failed"):
+            distiller._http_request("https://example.com/a", retries=2)
+        # Failures 4 and 5 open the circuit, so this call's third attempt never reaches the network
+        with pytest.raises(RuntimeError, match="Circuit open for example.com"):
+            distiller._http_request("https://example.com/b", retries=2)
+        with pytest.raises(RuntimeError, match="Circuit open"):
+            distiller._http_request("https://example.com/c", retries=2)
+        assert mock_urlopen.call_count == distiller.BREAKER_THRESHOLD
+
+    @mock.patch("time.sleep")
+    @mock.patch("urllib.request.urlopen")
+    def test_circuit_breaker_is_per_host(self, mock_urlopen, mock_sleep):
+        mock_urlopen.side_effect = [urllib.error.URLError("down")] * distiller.BREAKER_THRESHOLD + [_urlopen_response()]
+        with pytest.raises(RuntimeError):
+            distiller._http_request("https://down.example.com/", retries=distiller.BREAKER_THRESHOLD)
+        assert distiller._http_request("https://up.example.com/", retries=0) == {"ok": True}
+
+    @mock.patch("time.sleep")
+    @mock.patch("urllib.request.urlopen")
+    def test_success_resets_breaker(self, mock_urlopen, mock_sleep):
+        almost = distiller.BREAKER_THRESHOLD - 1
+        mock_urlopen.side_effect = [urllib.error.URLError("down")] * almost + [_urlopen_response()]
+        assert distiller._http_request("https://example.com/", retries=almost) == {"ok": True}
+        assert distiller._breaker == {}
+
+    @mock.patch("time.sleep")
+    @mock.patch("urllib.request.urlopen")
+    def test_breaker_half_opens_after_cooldown(self, mock_urlopen, mock_sleep, monkeypatch):
+        monkeypatch.setattr(distiller, "BREAKER_COOLDOWN", 0.0)
+        mock_urlopen.side_effect = [urllib.error.URLError("down")] * distiller.BREAKER_THRESHOLD + [_urlopen_response()]
+        with pytest.raises(RuntimeError):
+            distiller._http_request("https://example.com/", retries=distiller.BREAKER_THRESHOLD - 1)
+        assert distiller._http_request("https://example.com/", retries=0) == {"ok": True}
+
+    @mock.patch("time.sleep")
+    @mock.patch("urllib.request.urlopen")
+    def test_open_window_doubles_with_each_failure(self, mock_urlopen, mock_sleep, monkeypatch):
+        monkeypatch.setattr(distiller, "BREAKER_COOLDOWN", 10.0)
+        mock_urlopen.side_effect = urllib.error.URLError("down")
+        with mock.patch("time.monotonic", return_value=0.0):
+            with pytest.raises(RuntimeError):
+                distiller._http_request("https://example.com/", retries=distiller.BREAKER_THRESHOLD - 1)
+            assert distiller._breaker["example.com"][1] == 10.0
+        with mock.patch("time.monotonic", return_value=10.0):  # half-open probe fails
+            with pytest.raises(RuntimeError):
+                distiller._http_request("https://example.com/", retries=0)
+        assert distiller._breaker["example.com"][1] == 30.0
+
+    @mock.patch("time.sleep")
+    @mock.patch("urllib.request.urlopen")
+    def test_openrouter_breaker_is_per_provider(self, mock_urlopen, mock_sleep):
+        error = urllib.error.HTTPError("url", 503, "unavailable", {}, None)
+        mock_urlopen.side_effect = [error] * distiller.BREAKER_THRESHOLD + [_urlopen_response()]
+        messages = [{"role": "user", "content": "hi"}]
+        for _ in range(distiller.BREAKER_THRESHOLD):
+            distiller._openrouter_request("key", "m/a", "down-provider", messages, 10)
+        assert "Circuit open" in distiller._openrouter_request("key", "m/a", "down-provider", messages, 10)["error"]
+        assert distiller._openrouter_request("key", "m/b", "up-provider", messages, 10)["status"] == "ok"
+
+
+class TestBackoffDelay:
+    def test_jitter_within_bounds(self):
+        for attempt in range(4):
+            for _ in range(20):
+                wait = distiller._backoff_delay(attempt)
+                assert 0 <= wait <= distiller.RETRY_DELAY * (2 ** attempt)
+
+    def test_jitter_capped(self):
+        for _ in range(20):
+            assert 0 <= distiller._backoff_delay(10) <= distiller.BACKOFF_CAP
+
+    def test_retry_after_is_floor(self):
+        assert distiller._backoff_delay(0, "5") >= 5.0
+
+    def test_past_http_date_retry_after_ignored(self):
+        wait = distiller._backoff_delay(0, "Wed, 21 Oct 2015 07:28:00 GMT")
+        assert 0 <= wait <= distiller.RETRY_DELAY
+
+    def test_future_http_date_retry_after_is_floor(self):
+        from email.utils import formatdate
+        wait = distiller._backoff_delay(0, formatdate(time.time() + 6, usegmt=True))
+        assert 4 <= wait <= 6
+
+    def test_retry_after_beyond_cap_returns_none(self):
+        from email.utils import formatdate
+        assert distiller._backoff_delay(0, "86400") is None
+        assert distiller._backoff_delay(0, formatdate(time.time() + 3600, usegmt=True)) is None
+
+    def test_garbage_retry_after_ignored(self):
+        wait = distiller._backoff_delay(0, "soon")
+        assert 0 <= wait <= distiller.RETRY_DELAY
+
 
 # ---------------------------------------------------------------------------
 # grok_query (response parsing)
 # ---------------------------------------------------------------------------
 
+@pytest.mark.usefixtures("grok_key")
 class TestGrokQueryParsing:
     """Test grok_query response parsing without making real API calls."""
 
     @mock.patch.object(distiller, "load_env")
     @mock.patch.object(distiller, "_http_request")
-    def test_parses_clean_json(self, mock_http, mock_env, monkeypatch):
-        monkeypatch.setenv("GROK_API_KEY", "test-key")
+    def test_parses_clean_json(self, mock_http, mock_env):
         mock_http.return_value = {
             "choices": [{"message": {"content": '{"findings": [], "summary": "Nothing found."}'}}]
         }
@@ -923,8 +1522,7 @@ class TestGrokQueryParsing:
 
     @mock.patch.object(distiller, "load_env")
     @mock.patch.object(distiller, "_http_request")
-    def test_strips_markdown_fences(self, mock_http, mock_env, monkeypatch):
-        monkeypatch.setenv("GROK_API_KEY", "test-key")
+    def test_strips_markdown_fences(self, mock_http, mock_env):
         mock_http.return_value = {
             "choices": [{"message": {"content": '```json\n{"findings": [], "summary": "Fenced."}\n```'}}]
         }
@@ -933,8 +1531,7 @@ class TestGrokQueryParsing:
 
     @mock.patch.object(distiller, "load_env")
     @mock.patch.object(distiller, "_http_request")
-    def test_invalid_json_returns_raw(self, mock_http, mock_env, monkeypatch):
-        monkeypatch.setenv("GROK_API_KEY", "test-key")
+    def test_invalid_json_returns_raw(self, mock_http, mock_env):
         mock_http.return_value = {
             "choices": [{"message": {"content": "This is not JSON at all"}}]
         }
@@ -954,25 +1551,14 @@ class TestGrokQueryParsing:
 # ---------------------------------------------------------------------------
 
 class TestParseModelSpec:
-    def test_simple_model(self):
-        model_id, provider = distiller._parse_model_spec("x-ai/grok-4.1-fast")
-        assert model_id == "x-ai/grok-4.1-fast"
-        assert provider is None
-
-    def test_model_with_provider(self):
-        model_id, provider = distiller._parse_model_spec("anthropic/claude-sonnet-4.5:google-vertex")
-        assert model_id == "anthropic/claude-sonnet-4.5"
-        assert provider == "google-vertex"
-
-    def test_model_with_colon_in_name(self):
-        model_id, provider = distiller._parse_model_spec("moonshotai/kimi-k2.5:moonshotai")
-        assert model_id == "moonshotai/kimi-k2.5"
-        assert provider == "moonshotai"
-
-    def test_no_slash(self):
-        model_id, provider = distiller._parse_model_spec("gpt-4")
-        assert model_id == "gpt-4"
-        assert provider is None
+    @pytest.mark.parametrize("spec, model_id, provider", [
+        ("x-ai/grok-4.1-fast", "x-ai/grok-4.1-fast", None),
+        ("anthropic/claude-sonnet-4.5:google-vertex", "anthropic/claude-sonnet-4.5", "google-vertex"),
+        ("moonshotai/kimi-k2.5:moonshotai", "moonshotai/kimi-k2.5", "moonshotai"),
+        ("gpt-4", "gpt-4", None),
+    ], ids=["simple_model", "model_with_provider", "model_with_colon_in_name", "no_slash"])
+    def test_parse(self, spec, model_id, provider):
+        assert distiller._parse_model_spec(spec) == (model_id, provider)
 
 
 # ---------------------------------------------------------------------------
@@ -1003,6 +1589,14 @@ class TestOpenrouterRequest:
         payload = json.loads(call_args[1]["data"] if "data" in call_args[1] else call_args[0][1])
         assert payload["provider"] == {"order": ["vertex"], "allow_fallbacks": False}
 
+    @mock.patch.object(distiller, "_http_request")
+    def test_payload_messages_round_trip(self, mock_http):
+        mock_http.return_value = {"choices": [{"message": {"content": "ok"}}], "usage": {}}
+        messages = [{"role": "system", "content": 'Skill "body"\n— ünïcode'}, {"role": "user", "content": "hi"}]
+        distiller._openrouter_request("key", "model/id", None, messages, 2000)
+        payload = json.loads(mock_http.call_args[1]["data"])
+        assert payload == {"model": "model/id", "max_tokens": 2000, "temperature": 0.2, "messages": messages}
+
     @mock.patch.object(distiller, "_http_request", side_effect=RuntimeError("boom"))
     def test_error_handling(self, mock_http):
         result = distiller._openrouter_request("key", "model/id", None, [{"role": "user", "content": "hi"}], 2000)
@@ -1015,20 +1609,25 @@ class TestOpenrouterRequest:
 # ---------------------------------------------------------------------------
 
 class TestLoadSkillPattern:
-    def test_loads_single_quote_pattern(self, tmp_path):
-        patterns_file = tmp_path / "skill-patterns.sh"
-        patterns_file.write_text(
+    @pytest.mark.parametrize("content, name, expected", [
+        (
             "declare -A SKILL_PATTERNS\n"
-            "SKILL_PATTERNS[php-laravel]='\\bphp\\b|laravel|eloquent'\n"
-        )
-        result = distiller._load_skill_pattern("php-laravel", str(patterns_file))
-        assert result == "\\bphp\\b|laravel|eloquent"
-
-    def test_loads_double_quote_pattern(self, tmp_path):
+            "SKILL_PATTERNS[php-laravel]='\\bphp\\b|laravel|eloquent'\n",
+            "php-laravel", "\\bphp\\b|laravel|eloquent",
+        ),
+        ('SKILL_PATTERNS[test-skill]="test|pattern"\n', "test-skill", "test|pattern"),
+    ], ids=["single_quote", "double_quote"])
+    def test_parses_quoted_pattern(self, content, name, expected):
+        assert distiller._parse_skill_patterns(content) == {name: expected}
+
+    def test_first_assignment_wins(self):
+        text = "SKILL_PATTERNS[a]='one'\nSKILL_PATTERNS[a]='two'\n"
+        assert distiller._parse_skill_patterns(text) == {"a": "one"}
+
+    def test_loads_from_file(self, tmp_path):
         patterns_file = tmp_path / "skill-patterns.sh"
         patterns_file.write_text('SKILL_PATTERNS[test-skill]="test|pattern"\n')
-        result = distiller._load_skill_pattern("test-skill", str(patterns_file))
-        assert result == "test|pattern"
+        assert distiller._load_skill_pattern("test-skill", str(patterns_file)) == "test|pattern"
 
     def test_returns_none_for_missing_skill(self, tmp_path):
         patterns_file = tmp_path / "skill-patterns.sh"
@@ -1045,6 +1644,18 @@ class TestLoadSkillPattern:
         result = distiller._load_skill_pattern("anything")
         assert result is None
 
+    def test_file_read_once_until_changed(self, tmp_path):
+        patterns_file = tmp_path / "skill-patterns.sh"
+        patterns_file.write_text("SKILL_PATTERNS[a]='one'\nSKILL_PATTERNS[b]=\"two\"\n")
+        with mock.patch.object(Path, "read_text", autospec=True, side_effect=Path.read_text) as read:
+            assert distiller._load_skill_pattern("a", str(patterns_file)) == "one"
+            assert distiller._load_skill_pattern("b", str(patterns_file)) == "two"
+            assert read.call_count == 1
+        patterns_file.write_text("SKILL_PATTERNS[a]='changed'\n")
+        os.utime(patterns_file, ns=(0, 0))  # force a new mtime even on coarse clocks
+        assert distiller._load_skill_pattern("a", str(patterns_file)) == "changed"
+        assert distiller._load_skill_pattern("b", str(patterns_file)) is None
+
 
 # ---------------------------------------------------------------------------
 # eval_triggers
@@ -1091,6 +1702,7 @@ class TestEvalTriggers:
         assert result["metrics"]["precision"] == 0.0
 
     def test_case_insensitive_matching(self):
+        """Queries are lowercased before matching; the pattern itself is compiled without IGNORECASE."""
         queries = {
             "should_trigger": ["Help with LARAVEL routing"],
             "should_not_trigger": [],
@@ -1119,6 +1731,16 @@ class TestEvalTriggers:
         assert result["metrics"]["accuracy"] == 0.0
         assert result["matches"] == []
 
+    def test_no_detail_omits_matches(self):
+        queries = {
+            "should_trigger": ["test this", "miss"],
+            "should_not_trigger": ["other thing"],
+        }
+        full = distiller.eval_triggers("my-skill", queries, pattern=r"test")
+        brief = distiller.eval_triggers("my-skill", queries, pattern=r"test", detail=False)
+        assert "matches" not in brief
+        assert brief["metrics"] == full["metrics"]
+
     def test_output_structure(self):
         queries = {
             "should_trigger": ["test this"],
@@ -1132,15 +1754,59 @@ class TestEvalTriggers:
         assert all(k in result["metrics"] for k in ("precision", "recall", "f1", "accuracy"))
 
 
+# ---------------------------------------------------------------------------
+# test_skill
+# ---------------------------------------------------------------------------
+
+@pytest.mark.usefixtures("openrouter_key")
+class TestTestSkill:
+    @mock.patch.object(distiller, "load_env")
+    @mock.patch.object(distiller, "_openrouter_request")
+    def test_duplicate_prompts_each_called_by_default(self, mock_request, mock_env, sample_skill):
+        mock_request.return_value = {"response": "ok", "tokens": 1, "status": "ok"}
+        distiller.test_skill("test-skill", ["p1", "p2", "p1"], models=["m/a", "m/b"])
+        assert mock_request.call_count == 6
+
+    @mock.patch.object(distiller, "load_env")
+    @mock.patch.object(distiller, "_openrouter_request")
+    def test_cache_responses_shares_duplicate_prompts(self, mock_request, mock_env, sample_skill):
+        mock_request.return_value = {"response": "ok", "tokens": 1, "status": "ok"}
+        result = distiller.test_skill("test-skill", ["p1", "p2", "p1"], models=["m/a", "m/b"], cache_responses=True)
+        assert mock_request.call_count == 4  # 2 unique prompts x 2 models
+        assert [(r["model"], r["prompt"]) for r in result["results"]] == [
+            ("m/a", "p1"), ("m/a", "p2"), ("m/a", "p1"), ("m/b", "p1"), ("m/b", "p2"), ("m/b", "p1"),
+        ]
+
+    @mock.patch.object(distiller, "load_env")
+    @mock.patch.object(distiller, "_http_request")
+    def test_cache_ttl_reuses_responses_until_skill_changes(self, mock_http, mock_env, sample_skill):
+        mock_http.return_value = {"choices": [{"message": {"content": "hi"}}], "usage": {"total_tokens": 3}}
+        distiller.test_skill("test-skill", ["p1"], models=["m/a"], cache_ttl=3600)
+        distiller.test_skill("test-skill", ["p1"], models=["m/a"], cache_ttl=3600)
+        assert mock_http.call_count == 1
+        skill_md = sample_skill / "SKILL.md"
+        skill_md.write_text(skill_md.read_text() + "\nEdited.\n")
+        distiller.test_skill("test-skill", ["p1"], models=["m/a"], cache_ttl=3600)
+        assert mock_http.call_count == 2
+
+    @mock.patch.object(distiller, "load_env")
+    @mock.patch.object(distiller, "_http_request")
+    def test_no_cache_ttl_always_calls(self, mock_http, mock_env, sample_skill):
+        mock_http.return_value = {"choices": [{"message": {"content": "hi"}}], "usage": {"total_tokens": 3}}
+        distiller.test_skill("test-skill", ["p1"], models=["m/a"])
+        distiller.test_skill("test-skill", ["p1"], models=["m/a"])
+        assert mock_http.call_count == 2
+
+
 # ---------------------------------------------------------------------------
 # ab_eval
 # ---------------------------------------------------------------------------
 
+@pytest.mark.usefixtures("openrouter_key")
 class TestAbEval:
     @mock.patch.object(distiller, "load_env")
     @mock.patch.object(distiller, "_openrouter_request")
-    def test_produces_paired_results(self, mock_request, mock_env, sample_skill, monkeypatch):
-        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    def test_produces_paired_results(self, mock_request, mock_env, sample_skill):
         mock_request.return_value = {"response": "test", "tokens": 100, "status": "ok"}
         result = distiller.ab_eval("test-skill", ["prompt1"], models=["model/a"])
         assert len(result["pairs"]) == 1
@@ -1149,47 +1815,101 @@ class TestAbEval:
 
     @mock.patch.object(distiller, "load_env")
     @mock.patch.object(distiller, "_openrouter_request")
-    def test_baseline_has_no_system_prompt(self, mock_request, mock_env, sample_skill, monkeypatch):
-        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    def test_baseline_has_no_system_prompt(self, mock_request, mock_env, sample_skill):
         calls = []
-        def track_calls(api_key, model_id, provider_slug, messages, max_tokens, temperature=0.2):
+        def track_calls(api_key, model_id, provider_slug, messages, max_tokens, temperature=0.2, cache_ttl=None):
             calls.append(messages)
             return {"response": "ok", "tokens": 100, "status": "ok"}
         mock_request.side_effect = track_calls
         distiller.ab_eval("test-skill", ["prompt1"], models=["model/a"])
         assert len(calls) == 2
-        # First call is baseline (user message only)
-        assert len(calls[0]) == 1
-        assert calls[0][0]["role"] == "user"
-        # Second call is treatment (system + user)
-        assert len(calls[1]) == 2
-        assert calls[1][0]["role"] == "system"
+        # Legs run concurrently, so order calls by size: baseline (user only), then treatment
+        baseline, treatment = sorted(calls, key=len)
+        assert len(baseline) == 1
+        assert baseline[0]["role"] == "user"
+        assert len(treatment) == 2
+        assert treatment[0]["role"] == "system"
 
     @mock.patch.object(distiller, "load_env")
     @mock.patch.object(distiller, "_openrouter_request")
-    def test_multiple_prompts_and_models(self, mock_request, mock_env, sample_skill, monkeypatch):
-        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    def test_multiple_prompts_and_models(self, mock_request, mock_env, sample_skill):
         mock_request.return_value = {"response": "ok", "tokens": 100, "status": "ok"}
         result = distiller.ab_eval("test-skill", ["p1", "p2"], models=["m/a", "m/b"])
         assert len(result["pairs"]) == 4  # 2 models x 2 prompts
         assert mock_request.call_count == 8  # 4 pairs x 2 requests each
 
+    @mock.patch.object(distiller, "load_env")
+    @mock.patch.object(distiller, "_openrouter_request")
+    def test_pairs_keep_order_under_concurrency(self, mock_request, mock_env, sample_skill):
+        def respond(api_key, model_id, provider_slug, messages, max_tokens, temperature=0.2, cache_ttl=None):
+            leg = "treatment" if messages[0]["role"] == "system" else "baseline"
+            if model_id == "m/a":
+                time.sleep(0.01)  # finish out of submission order
+            return {"response": f"{model_id}|{messages[-1]['content']}|{leg}", "tokens": 1, "status": "ok"}
+        mock_request.side_effect = respond
+        result = distiller.ab_eval("test-skill", ["p1", "p2"], models=["m/a", "m/b"], concurrency=4)
+        assert [(p["model"], p["prompt"]) for p in result["pairs"]] == [
+            ("m/a", "p1"), ("m/a", "p2"), ("m/b", "p1"), ("m/b", "p2"),
+        ]
+        for pair in result["pairs"]:
+            for leg in ("baseline", "treatment"):
+                assert pair[leg]["response"] == f"{pair['model']}|{pair['prompt']}|{leg}"
+
+    @mock.patch.object(distiller, "load_env")
+    @mock.patch.object(distiller, "_openrouter_request")
+    def test_duplicate_prompts_share_baseline(self, mock_request, mock_env, sample_skill):
+        mock_request.return_value = {"response": "ok", "tokens": 1, "status": "ok"}
+        result = distiller.ab_eval("test-skill", ["p1", "p1"], models=["m/a"])
+        assert len(result["pairs"]) == 2
+        assert mock_request.call_count == 3  # 1 shared baseline + 1 treatment per listed prompt
+        assert result["pairs"][0]["baseline"] is result["pairs"][1]["baseline"]
+
+    @mock.patch.object(distiller, "load_env")
+    @mock.patch.object(distiller, "_openrouter_request")
+    def test_cache_responses_shares_treatment(self, mock_request, mock_env, sample_skill):
+        mock_request.return_value = {"response": "ok", "tokens": 1, "status": "ok"}
+        result = distiller.ab_eval("test-skill", ["p1", "p1"], models=["m/a"], cache_responses=True)
+        assert mock_request.call_count == 2
+        assert result["pairs"][0]["treatment"] is result["pairs"][1]["treatment"]
+
+    @mock.patch.object(distiller, "load_env")
+    @mock.patch.object(distiller, "_openrouter_request")
+    def test_no_baseline_cache_calls_every_duplicate(self, mock_request, mock_env, sample_skill):
+        mock_request.return_value = {"response": "ok", "tokens": 1, "status": "ok"}
+        distiller.ab_eval("test-skill", ["p1", "p1"], models=["m/a"], baseline_cache=False)
+        assert mock_request.call_count == 4
+
+    @mock.patch.object(distiller, "load_env")
+    @mock.patch.object(distiller, "_http_request")
+    def test_baselines_rerun_without_cache_ttl(self, mock_http, mock_env, sample_skill):
+        mock_http.return_value = {"choices": [{"message": {"content": "hi"}}], "usage": {"total_tokens": 3}}
+        distiller.ab_eval("test-skill", ["p1"], models=["m/a"])
+        distiller.ab_eval("test-skill", ["p1"], models=["m/a"])
+        assert mock_http.call_count == 4
+
+    @mock.patch.object(distiller, "load_env")
+    @mock.patch.object(distiller, "_http_request")
+    def test_no_baseline_cache_keeps_baselines_fresh(self, mock_http, mock_env, sample_skill):
+        mock_http.return_value = {"choices": [{"message": {"content": "hi"}}], "usage": {"total_tokens": 3}}
+        for _ in range(2):
+            distiller.ab_eval("test-skill", ["p1"], models=["m/a"], cache_ttl=3600, baseline_cache=False)
+        # Second run reuses the cached treatment; the baseline is always re-run
+        assert mock_http.call_count == 3
+
     def test_missing_api_key_exits(self, sample_skill, monkeypatch):
         monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
         monkeypatch.setattr(distiller, "ENV_FILE", Path("/nonexistent/.env"))
         with pytest.raises(SystemExit):
             distiller.ab_eval("test-skill", ["prompt"])
 
-    def test_missing_skill_exits(self, tmp_project, monkeypatch):
-        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    def test_missing_skill_exits(self, tmp_project):
         (tmp_project / "generated-skills" / "nonexistent").mkdir()
         with pytest.raises(SystemExit):
             distiller.ab_eval("nonexistent", ["prompt"])
 
     @mock.patch.object(distiller, "load_env")
     @mock.patch.object(distiller, "_openrouter_request")
-    def test_output_structure(self, mock_request, mock_env, sample_skill, monkeypatch):
-        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    def test_output_structure(self, mock_request, mock_env, sample_skill):
         mock_request.return_value = {"response": "r", "tokens": 50, "status": "ok"}
         result = distiller.ab_eval("test-skill", ["p1"], models=["m/a"])
         assert result["skill"] == "test-skill"
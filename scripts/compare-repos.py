@@ -20,29 +20,51 @@ Usage:
     # Filter to skills only or agents only
     python3 scripts/compare-repos.py --type skills ../repos/
     python3 scripts/compare-repos.py --type agents ../repos/
+
+    # Trim the overlap table to each component's 10 closest matches (high-similarity ones always kept)
+    python3 scripts/compare-repos.py --top 10 ../repos/
+
+Each repo's scanned catalog is cached under .compare-cache/repos/ and reused
+until a file in its skills/agents/plugins/categories trees changes.
+
+Requires Python 3.10+ (slotted dataclasses, int.bit_count).
 """
 
 from __future__ import annotations
 
 import argparse
+import contextlib
+import hashlib
+import heapq
 import json
 import os
 import re
 import sys
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
+from operator import attrgetter, itemgetter
 from pathlib import Path
 
 PLUGIN_ROOT = Path(__file__).resolve().parent.parent / "plugins" / "compound-engineering"
 CACHE_DIR = Path(__file__).resolve().parent.parent / ".compare-cache"
 REPORT_DIR = Path(__file__).resolve().parent.parent / "reports"
+# Cache files are machine-read only; pipe through `python3 -m json.tool` to inspect
+_COMPACT_JSON = (",", ":")
+# Threads overlapping the many small component-file reads within one scan directory
+READ_WORKERS = 16
+# Matches at or above this are reported individually as likely the same component
+HIGH_SIMILARITY = 0.5
 
 
 # ---------------------------------------------------------------------------
 # Data structures
 # ---------------------------------------------------------------------------
 
-@dataclass
+# Fields are filled in eagerly, even keywords/reference_files: scan_repo_cached and
+# save_catalog serialize whole components, and catalog cache hits skip extract_keywords
+# entirely. --type only filters the report, so one cached scan serves every filter.
+@dataclass(slots=True)
 class Component:
     """A skill or agent found in a repo."""
     kind: str  # "skill" or "agent"
@@ -81,6 +103,11 @@ def parse_frontmatter(text: str) -> dict:
     return result
 
 
+_H2_RE = re.compile(r"^##\s+(.+)$", re.MULTILINE)
+_TRIGGER_RE = re.compile(r"(?:trigger|keyword|pattern)s?[:\s]+(.+)", re.IGNORECASE)
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]")
+
+
 def extract_keywords(text: str, name: str) -> list[str]:
     """Extract likely keywords from skill/agent content."""
     keywords = set()
@@ -90,15 +117,16 @@ def extract_keywords(text: str, name: str) -> list[str]:
             keywords.add(part.lower())
 
     # Look for ## headings
-    for m in re.finditer(r"^##\s+(.+)$", text, re.MULTILINE):
+    strip_non_alnum = _NON_ALNUM_RE.sub
+    for m in _H2_RE.finditer(text):
         heading = m.group(1).strip().lower()
         for word in heading.split():
-            word = re.sub(r"[^a-z0-9]", "", word)
+            word = strip_non_alnum("", word)
             if len(word) > 3:
                 keywords.add(word)
 
     # Look for trigger/keyword sections
-    for m in re.finditer(r"(?:trigger|keyword|pattern)[s]?[:\s]+(.+)", text, re.IGNORECASE):
+    for m in _TRIGGER_RE.finditer(text):
         for word in m.group(1).split(","):
             word = word.strip().strip('"').strip("'").lower()
             if 2 < len(word) < 30:
@@ -111,36 +139,84 @@ def extract_keywords(text: str, name: str) -> list[str]:
 # Repo scanners — handle different directory structures
 # ---------------------------------------------------------------------------
 
+def _walk_files(root: str, prefix: str = ""):
+    """Yield (path, relpath, name) for every file under root, depth-first in directory order.
+
+    Same order and symlink handling as Path.rglob("*") — symlinked directories are
+    listed but not descended — but each directory costs one os.scandir and the
+    DirEntry's cached file type, instead of a Path object plus stat per entry.
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry)
+        elif entry.is_file():
+            yield entry.path, prefix + entry.name, entry.name
+    for entry in subdirs:
+        yield from _walk_files(entry.path, prefix + entry.name + os.sep)
+
+
+def _read_text(path: str) -> str:
+    """Read a file as UTF-8 text, replacing undecodable bytes."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _read_skill_md(skill_dir: str) -> str | None:
+    """Text of a skill directory's SKILL.md, or None if it has none."""
+    try:
+        return _read_text(os.path.join(skill_dir, "SKILL.md"))
+    except FileNotFoundError:
+        return None
+
+
+def _prefetch(read, paths: list[str]) -> list:
+    """read() every path on a small thread pool, results in input order.
+
+    File reads release the GIL, so the open/read latency of many small files
+    overlaps; errors surface in order when the results are consumed.
+    """
+    if len(paths) < 2:
+        return [read(p) for p in paths]
+    with ThreadPoolExecutor(max_workers=min(READ_WORKERS, len(paths))) as pool:
+        return list(pool.map(read, paths))
+
+
 def scan_skills_dir(skills_dir: Path, repo_name: str) -> list[Component]:
     """Scan a skills/ directory for SKILL.md files."""
     components = []
-    if not skills_dir.is_dir():
+    try:
+        with os.scandir(skills_dir) as it:
+            skill_dirs = sorted((e for e in it if e.is_dir()), key=attrgetter("name"))
+    except OSError:
         return components
 
-    for skill_dir in sorted(skills_dir.iterdir()):
-        if not skill_dir.is_dir():
+    base = skills_dir.name + os.sep  # Component.path is relative to the skills dir's parent
+    texts = _prefetch(_read_skill_md, [e.path for e in skill_dirs])
+    for entry, text in zip(skill_dirs, texts):
+        if text is None:
             continue
-        skill_md = skill_dir / "SKILL.md"
-        if not skill_md.exists():
-            continue
-
-        text = skill_md.read_text(errors="replace")
         fm = parse_frontmatter(text)
         lines = text.splitlines()
 
         # Find reference files
-        ref_files = []
-        for f in skill_dir.rglob("*"):
-            if f.is_file() and f.name != "SKILL.md" and f.suffix in (".md", ".txt"):
-                ref_files.append(str(f.relative_to(skill_dir)))
+        ref_files = [
+            rel for _, rel, fname in _walk_files(entry.path)
+            if fname != "SKILL.md" and os.path.splitext(fname)[1] in (".md", ".txt")
+        ]
 
         comp = Component(
             kind="skill",
-            name=skill_dir.name,
+            name=entry.name,
             repo=repo_name,
-            path=str(skill_md.relative_to(skill_dir.parent.parent)),
+            path=f"{base}{entry.name}{os.sep}SKILL.md",
             description=fm.get("description", ""),
-            keywords=extract_keywords(text, skill_dir.name),
+            keywords=extract_keywords(text, entry.name),
             frontmatter=fm,
             line_count=len(lines),
             has_references=bool(ref_files),
@@ -153,22 +229,24 @@ def scan_skills_dir(skills_dir: Path, repo_name: str) -> list[Component]:
 def scan_agents_dir(agents_dir: Path, repo_name: str) -> list[Component]:
     """Scan an agents/ directory for agent .md files."""
     components = []
-    if not agents_dir.is_dir():
-        return components
-
-    for item in sorted(agents_dir.rglob("*.md")):
-        if not item.is_file():
-            continue
-        text = item.read_text(errors="replace")
+    # Relative paths come out of the walk already prefixed with the agents dir's name
+    # (Component.path is relative to its parent); a missing dir simply yields nothing.
+    # Sorted by path components, as sorting the Path objects from rglob did.
+    agent_files = sorted(
+        (f for f in _walk_files(str(agents_dir), agents_dir.name + os.sep) if f[2].endswith(".md")),
+        key=lambda f: f[1].split(os.sep),
+    )
+    texts = _prefetch(_read_text, [f[0] for f in agent_files])
+    for (_, rel, fname), text in zip(agent_files, texts):
         fm = parse_frontmatter(text)
         lines = text.splitlines()
 
-        name = item.stem
+        name = os.path.splitext(fname)[0]
         comp = Component(
             kind="agent",
             name=name,
             repo=repo_name,
-            path=str(item.relative_to(agents_dir.parent)),
+            path=rel,
             description=fm.get("description", ""),
             keywords=extract_keywords(text, name),
             frontmatter=fm,
@@ -212,44 +290,28 @@ def scan_repo(repo_path: Path) -> list[Component]:
 # Similarity matching
 # ---------------------------------------------------------------------------
 
-def name_similarity(a: str, b: str) -> float:
-    """Simple word-overlap similarity between component names."""
-    words_a = set(a.replace("-", " ").replace("_", " ").lower().split())
-    words_b = set(b.replace("-", " ").replace("_", " ").lower().split())
-    if not words_a or not words_b:
-        return 0.0
-    intersection = words_a & words_b
-    union = words_a | words_b
-    return len(intersection) / len(union)
-
-
-def keyword_similarity(a: list[str], b: list[str]) -> float:
-    """Jaccard similarity between keyword sets."""
-    set_a = set(a)
-    set_b = set(b)
-    if not set_a or not set_b:
-        return 0.0
-    intersection = set_a & set_b
-    union = set_a | set_b
-    return len(intersection) / len(union)
-
-
-def combined_similarity(ours: Component, theirs: Component) -> float:
-    """Weighted combination of name and keyword similarity."""
-    ns = name_similarity(ours.name, theirs.name)
-    ks = keyword_similarity(ours.keywords, theirs.keywords)
-    # Exact name match gets a bonus
-    if ours.name == theirs.name:
-        ns = 1.0
-    # Weight: name match is more reliable than keyword overlap
-    return 0.6 * ns + 0.4 * ks
+def _name_words(name: str) -> set[str]:
+    """Lowercased words of a component name, split on hyphens, underscores and spaces."""
+    return set(name.replace("-", " ").replace("_", " ").lower().split())
+
+
+def keyword_masks(components: list[Component]) -> list[int]:
+    """Encode each component's keywords as a bitmask over one shared vocabulary."""
+    vocab: dict[str, int] = {}
+    masks = []
+    for c in components:
+        mask = 0
+        for kw in c.keywords:
+            mask |= 1 << vocab.setdefault(kw, len(vocab))
+        masks.append(mask)
+    return masks
 
 
 # ---------------------------------------------------------------------------
 # Comparison engine
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class Match:
     """A potential overlap between our component and an external one."""
     ours: Component
@@ -258,46 +320,89 @@ class Match:
     size_ratio: float  # theirs.line_count / ours.line_count
 
 
-def find_overlaps(
+def match_components(
     our_components: list[Component],
     external_components: list[Component],
     threshold: float = 0.15,
-) -> list[Match]:
-    """Find overlapping components above similarity threshold."""
+    top_k: int = 0,
+) -> tuple[list[Match], list[Component]]:
+    """Find overlapping matches and unmatched external components in one pass.
+
+    A pair can only score above zero if both sides are the same kind and share a
+    keyword, a name word, or the exact name, so candidates come from an inverted
+    index over the external components rather than from every (ours, theirs) pair.
+
+    With top_k > 0, each of our components keeps every HIGH_SIMILARITY match (the
+    report always lists those) plus at most its top_k best lower-similarity ones
+    (ties go to the earlier external component). Unmatched detection still sees
+    every score, so a truncated match never turns into a gap.
+    """
+    postings: dict[tuple[str, str, str], list[int]] = {}
+    by_kind: dict[str, list[int]] = {}
+    ext_names = [ext.name for ext in external_components]
+    ext_words = [_name_words(name) for name in ext_names]
+    for i, ext in enumerate(external_components):
+        by_kind.setdefault(ext.kind, []).append(i)
+        tokens = {("kw", kw) for kw in ext.keywords}
+        tokens.update(("word", w) for w in ext_words[i])
+        tokens.add(("name", ext.name))
+        for tag, tok in tokens:
+            postings.setdefault((ext.kind, tag, tok), []).append(i)
+
+    # Keyword Jaccard on interned bitmasks: one & / | plus popcounts per pair, no set building
+    masks = keyword_masks(list(our_components) + list(external_components))
+    our_masks, ext_masks = masks[:len(our_components)], masks[len(our_components):]
+
+    best_sim = [0.0] * len(external_components)
     matches = []
-    for ours in our_components:
-        for theirs in external_components:
-            # Only compare same kind (skill vs skill, agent vs agent)
-            if ours.kind != theirs.kind:
-                continue
-            sim = combined_similarity(ours, theirs)
+    for ours, our_mask in zip(our_components, our_masks):
+        kind, name = ours.kind, ours.name
+        words = _name_words(name)
+        if threshold <= 0:
+            # Zero-similarity pairs qualify too: every same-kind component is a candidate
+            candidates = by_kind.get(kind, [])
+        else:
+            found: set[int] = set()
+            for kw in ours.keywords:
+                found.update(postings.get((kind, "kw", kw), ()))
+            for w in words:
+                found.update(postings.get((kind, "word", w), ()))
+            found.update(postings.get((kind, "name", name), ()))
+            candidates = sorted(found)  # external order, as the full nested loop visited them
+        hits = []
+        for i in candidates:
+            # Name-word Jaccard (exact name scores 1.0) and keyword Jaccard on precomputed
+            # words and masks; a disjoint side scores 0.0 without building the union or dividing
+            if name == ext_names[i]:
+                ns = 1.0
+            else:
+                shared = len(words & ext_words[i])
+                ns = shared / len(words | ext_words[i]) if shared else 0.0
+            common = our_mask & ext_masks[i]
+            ks = common.bit_count() / (our_mask | ext_masks[i]).bit_count() if common else 0.0
+            sim = 0.6 * ns + 0.4 * ks  # name match is more reliable than keyword overlap
+            if sim > best_sim[i]:
+                best_sim[i] = sim
             if sim >= threshold:
-                size_ratio = theirs.line_count / max(ours.line_count, 1)
-                matches.append(Match(ours=ours, theirs=theirs, similarity=sim, size_ratio=size_ratio))
+                hits.append((i, sim))
+        if top_k and len(hits) > top_k:
+            high = [hit for hit in hits if hit[1] >= HIGH_SIMILARITY]
+            low = [hit for hit in hits if hit[1] < HIGH_SIMILARITY]
+            hits = high + heapq.nlargest(top_k, low, key=itemgetter(1))
+        for i, sim in hits:
+            theirs = external_components[i]
+            size_ratio = theirs.line_count / max(ours.line_count, 1)
+            matches.append(Match(ours=ours, theirs=theirs, similarity=sim, size_ratio=size_ratio))
 
     # Sort by similarity descending
-    matches.sort(key=lambda m: m.similarity, reverse=True)
-    return matches
-
+    matches.sort(key=attrgetter("similarity"), reverse=True)
 
-def find_unmatched(
-    external_components: list[Component],
-    our_components: list[Component],
-    threshold: float = 0.15,
-) -> list[Component]:
-    """Find external components with no match in our plugin."""
     our_names = {c.name for c in our_components}
-    unmatched = []
-    for ext in external_components:
-        best_sim = 0.0
-        for ours in our_components:
-            if ours.kind != ext.kind:
-                continue
-            sim = combined_similarity(ours, ext)
-            best_sim = max(best_sim, sim)
-        if best_sim < threshold and ext.name not in our_names:
-            unmatched.append(ext)
-    return unmatched
+    unmatched = [
+        ext for ext, sim in zip(external_components, best_sim)
+        if sim < threshold and ext.name not in our_names
+    ]
+    return matches, unmatched
 
 
 # ---------------------------------------------------------------------------
@@ -331,10 +436,10 @@ def generate_report(
         lines.append("")
         lines.append(f"| Name | Lines | References | Keywords (sample) |")
         lines.append(f"|------|------:|:----------:|-------------------|")
-        for c in sorted(items, key=lambda x: x.name):
-            kw = ", ".join(c.keywords[:5])
-            ref = "yes" if c.has_references else "-"
-            lines.append(f"| {c.name} | {c.line_count} | {ref} | {kw} |")
+        lines.extend(
+            f"| {c.name} | {c.line_count} | {'yes' if c.has_references else '-'} | {', '.join(c.keywords[:5])} |"
+            for c in sorted(items, key=attrgetter("name"))
+        )
         lines.append("")
 
     # External repos summary
@@ -355,6 +460,10 @@ def generate_report(
     if filtered_matches:
         lines.append("| Ours | Theirs | Repo | Sim | Our Lines | Their Lines | Ratio |")
         lines.append("|------|--------|------|----:|----------:|------------:|------:|")
+        # Not redundant with match_components: it never repeats an (ours, theirs) pair, but
+        # a repo can hold several components with the same name (agents in different
+        # subdirectories, a skill under both skills/ and plugins/), and the table shows one
+        # row per name pair — the first, highest-similarity one.
         seen = set()
         for m in filtered_matches:
             key = (m.ours.name, m.theirs.name, m.theirs.repo)
@@ -369,7 +478,7 @@ def generate_report(
         lines.append("")
 
     # High-similarity matches (likely same skill/agent)
-    high_matches = [m for m in filtered_matches if m.similarity >= 0.5]
+    high_matches = [m for m in filtered_matches if m.similarity >= HIGH_SIMILARITY]
     if high_matches:
         lines.append("### High-Similarity Matches (>=0.50)")
         lines.append("")
@@ -404,9 +513,11 @@ def generate_report(
             lines.append("")
             lines.append("| Kind | Name | Lines | Description |")
             lines.append("|------|------|------:|-------------|")
-            for c in sorted(components, key=lambda x: (x.kind, x.name)):
-                desc = c.description[:80] + "..." if len(c.description) > 80 else c.description
-                lines.append(f"| {c.kind} | {c.name} | {c.line_count} | {desc} |")
+            lines.extend(
+                f"| {c.kind} | {c.name} | {c.line_count} "
+                f"| {c.description[:80] + '...' if len(c.description) > 80 else c.description} |"
+                for c in sorted(components, key=attrgetter("kind", "name"))
+            )
             lines.append("")
 
     # Statistics
@@ -427,6 +538,70 @@ def generate_report(
 # Cache for incremental runs
 # ---------------------------------------------------------------------------
 
+def _stamp_tree(root: str, digest, seen: set) -> None:
+    """Feed the mtime/size of root and everything below it into digest.
+
+    Follows symlinked directories, as the scanners do, guarding against loops by inode.
+    Directory mtimes catch added/removed/renamed entries; file mtimes catch edits.
+    """
+    try:
+        st = os.stat(root)
+    except OSError:
+        return
+    if (st.st_dev, st.st_ino) in seen:
+        return
+    seen.add((st.st_dev, st.st_ino))
+    digest.update(f"{root}\0{st.st_mtime_ns}\n".encode())
+    try:
+        with os.scandir(root) as it:
+            entries = sorted(it, key=attrgetter("name"))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_dir():
+                _stamp_tree(entry.path, digest, seen)
+            elif entry.is_file():
+                est = entry.stat()
+                digest.update(f"{entry.path}\0{est.st_mtime_ns}\0{est.st_size}\n".encode())
+        except OSError:
+            continue
+
+
+def repo_fingerprint(repo_path: Path) -> str:
+    """Stat-only fingerprint of everything scan_repo reads (plus this script, so scanner edits invalidate)."""
+    digest = hashlib.sha1(str(os.stat(__file__).st_mtime_ns).encode())
+    seen: set = set()
+    for sub in ("skills", "agents", "plugins", "categories"):
+        _stamp_tree(str(repo_path / sub), digest, seen)
+    return digest.hexdigest()
+
+
+def scan_repo_cached(repo_path: Path) -> list[Component]:
+    """scan_repo, reusing CACHE_DIR/repos/<name>-<path hash>.json while the repo's fingerprint is unchanged."""
+    # The path hash keeps same-named repos in different parents (a/plugin, b/plugin) apart
+    path_key = hashlib.sha1(str(repo_path.resolve()).encode()).hexdigest()[:12]
+    cache_path = CACHE_DIR / "repos" / f"{repo_path.name}-{path_key}.json"
+    fingerprint = repo_fingerprint(repo_path)
+    try:
+        cached = json.loads(cache_path.read_bytes())
+        if cached["fingerprint"] == fingerprint:
+            return [Component(**d) for d in cached["components"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # missing, stale format or corrupt: rescan
+    components = scan_repo(repo_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write-then-rename: repos are scanned in parallel processes, and a crash or concurrent
+    # writer must never leave a torn entry at the final path
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(json.dumps({
+        "fingerprint": fingerprint,
+        "components": [asdict(c) for c in components],
+    }, separators=_COMPACT_JSON).encode())
+    os.replace(tmp_path, cache_path)
+    return components
+
+
 def save_catalog(components: list[Component], cache_path: Path) -> None:
     """Save component catalog to JSON cache."""
     cache_path.parent.mkdir(parents=True, exist_ok=True)
@@ -443,14 +618,14 @@ def save_catalog(components: list[Component], cache_path: Path) -> None:
             "has_references": c.has_references,
             "reference_files": c.reference_files,
         })
-    cache_path.write_text(json.dumps(data, indent=2))
+    cache_path.write_bytes(json.dumps(data, separators=_COMPACT_JSON).encode())
 
 
 def load_catalog(cache_path: Path) -> list[Component]:
     """Load component catalog from JSON cache."""
     if not cache_path.exists():
         return []
-    data = json.loads(cache_path.read_text())
+    data = json.loads(cache_path.read_bytes())
     return [
         Component(
             kind=d["kind"],
@@ -501,6 +676,13 @@ def main() -> None:
         default=0.15,
         help="Similarity threshold for matches (default: 0.15)",
     )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=0,
+        metavar="K",
+        help="Keep at most K lower-similarity matches per our component, plus all high-similarity ones (default: all)",
+    )
     parser.add_argument(
         "--output",
         help="Output file path (default: reports/comparison-YYYY-MM-DD.md)",
@@ -511,7 +693,7 @@ def main() -> None:
 
     # Scan our plugin
     print("Scanning our plugin...", file=sys.stderr)
-    our_components = scan_repo(PLUGIN_ROOT.parent.parent)
+    our_components = scan_repo_cached(PLUGIN_ROOT.parent.parent)
     # Filter to only compound-engineering components
     our_components = [c for c in our_components if "compound-engineering" in c.repo]
     print(f"  Found {len(our_components)} components", file=sys.stderr)
@@ -560,19 +742,24 @@ def main() -> None:
                     if sub.is_dir() and not sub.name.startswith("."):
                         repo_paths.append(sub)
 
-        # Scan external repos
+        # Scan external repos — one process per repo, since each scan is independent
+        # walk + parse work; a single repo runs inline and skips the pool startup cost.
+        # Unchanged repos are served from their per-repo catalog cache.
+        # Results stream back in input order, each reported once its scan has finished.
         external_components: list[Component] = []
-        for repo_path in repo_paths:
-            print(f"Scanning {repo_path.name}...", file=sys.stderr)
-            components = scan_repo(repo_path)
-            print(f"  Found {len(components)} components", file=sys.stderr)
-            external_components.extend(components)
+        workers = min(len(repo_paths), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) if workers > 1 else contextlib.nullcontext() as pool:
+            scans = pool.map(scan_repo_cached, repo_paths) if pool else map(scan_repo_cached, repo_paths)
+            for repo_path, components in zip(repo_paths, scans):
+                print(f"Scanned {repo_path.name}", file=sys.stderr)
+                print(f"  Found {len(components)} components", file=sys.stderr)
+                external_components.extend(components)
 
         save_catalog(external_components, CACHE_DIR / "external.json")
 
     if args.catalog:
         # Just print the catalog
-        for c in sorted(external_components, key=lambda x: (x.repo, x.kind, x.name)):
+        for c in sorted(external_components, key=attrgetter("repo", "kind", "name")):
             kind_marker = "S" if c.kind == "skill" else "A"
             print(f"[{kind_marker}] {c.repo}/{c.name} ({c.line_count} lines)")
             if c.description:
@@ -585,13 +772,10 @@ def main() -> None:
         repo_key = c.repo.split("/")[0] if "/" in c.repo else c.repo
         external_by_repo.setdefault(repo_key, []).append(c)
 
-    # Find overlaps
+    # Find overlaps and unmatched external components in a single pass
     print("Finding overlaps...", file=sys.stderr)
-    matches = find_overlaps(our_components, external_components, threshold=args.threshold)
+    matches, unmatched = match_components(our_components, external_components, threshold=args.threshold, top_k=args.top)
     print(f"  Found {len(matches)} matches", file=sys.stderr)
-
-    # Find unmatched
-    unmatched = find_unmatched(external_components, our_components, threshold=args.threshold)
     print(f"  Found {len(unmatched)} unmatched external components", file=sys.stderr)
 
     # Generate report
@@ -614,7 +798,7 @@ def main() -> None:
     our_agents = len([c for c in our_components if c.kind == "agent"])
     ext_skills = len([c for c in external_components if c.kind == "skill"])
     ext_agents = len([c for c in external_components if c.kind == "agent"])
-    high = len([m for m in matches if m.similarity >= 0.5])
+    high = len([m for m in matches if m.similarity >= HIGH_SIMILARITY])
     print(f"\nSummary:")
     print(f"  Ours: {our_skills} skills, {our_agents} agents")
     print(f"  External: {ext_skills} skills, {ext_agents} agents")
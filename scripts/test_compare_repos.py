@@ -0,0 +1,214 @@
+"""Tests for compare-repos.py"""
+
+import importlib.util
+import os
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+# compare-repos.py isn't importable by name (hyphen); load it from its path
+_spec = importlib.util.spec_from_file_location("compare_repos", Path(__file__).parent / "compare-repos.py")
+compare_repos = importlib.util.module_from_spec(_spec)
+sys.modules["compare_repos"] = compare_repos  # dataclasses resolve annotations through sys.modules
+_spec.loader.exec_module(compare_repos)
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Point the catalog cache at a per-test directory."""
+    monkeypatch.setattr(compare_repos, "CACHE_DIR", tmp_path / ".compare-cache")
+
+
+@pytest.fixture
+def sample_repo(tmp_path):
+    """A repo with one skill (plus a reference file) and one agent."""
+    repo = tmp_path / "repos" / "sample"
+    skill = repo / "skills" / "code-review"
+    (skill / "references").mkdir(parents=True)
+    (skill / "SKILL.md").write_text("---\ndescription: Review code\n---\n## Review checklist\n")
+    (skill / "references" / "extra.md").write_text("notes")
+    (repo / "agents").mkdir()
+    (repo / "agents" / "security-sentinel.md").write_text("---\ndescription: Audit\n---\n## Security audit\n")
+    return repo
+
+
+# ---------------------------------------------------------------------------
+# scan_repo_cached
+# ---------------------------------------------------------------------------
+
+class TestScanRepoCached:
+    def test_matches_scan_repo(self, sample_repo):
+        assert compare_repos.scan_repo_cached(sample_repo) == compare_repos.scan_repo(sample_repo)
+
+    def test_unchanged_tree_served_from_cache(self, sample_repo):
+        first = compare_repos.scan_repo_cached(sample_repo)
+        with mock.patch.object(compare_repos, "scan_repo") as scan:
+            second = compare_repos.scan_repo_cached(sample_repo)
+        scan.assert_not_called()
+        assert second == first
+
+    @pytest.mark.parametrize("edited", ["skills/code-review/SKILL.md", "agents/security-sentinel.md"])
+    def test_edit_triggers_rescan(self, sample_repo, edited):
+        compare_repos.scan_repo_cached(sample_repo)
+        path = sample_repo / edited
+        st = path.stat()
+        path.write_text(path.read_text() + "## Added section\n")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))  # coarse-mtime filesystems
+        components = compare_repos.scan_repo_cached(sample_repo)
+        assert components == compare_repos.scan_repo(sample_repo)
+        assert any("added" in c.keywords for c in components)
+
+    def test_added_skill_triggers_rescan(self, sample_repo):
+        compare_repos.scan_repo_cached(sample_repo)
+        new_skill = sample_repo / "skills" / "debugging"
+        new_skill.mkdir()
+        (new_skill / "SKILL.md").write_text("## Debug\n")
+        assert "debugging" in {c.name for c in compare_repos.scan_repo_cached(sample_repo)}
+
+    def test_same_basename_repos_cached_separately(self, tmp_path):
+        for parent in ("a", "b"):
+            skill = tmp_path / parent / "plugin" / "skills" / f"skill-{parent}"
+            skill.mkdir(parents=True)
+            (skill / "SKILL.md").write_text("## Heading\n")
+        compare_repos.scan_repo_cached(tmp_path / "a" / "plugin")
+        compare_repos.scan_repo_cached(tmp_path / "b" / "plugin")
+        with mock.patch.object(compare_repos, "scan_repo") as scan:
+            names = [c.name for c in compare_repos.scan_repo_cached(tmp_path / "a" / "plugin")]
+        scan.assert_not_called()
+        assert names == ["skill-a"]
+
+    def test_corrupt_entry_rescanned_and_no_temp_files_left(self, sample_repo):
+        compare_repos.scan_repo_cached(sample_repo)
+        (entry,) = (compare_repos.CACHE_DIR / "repos").iterdir()
+        entry.write_bytes(b'{"fingerprint": "tru')
+        assert compare_repos.scan_repo_cached(sample_repo) == compare_repos.scan_repo(sample_repo)
+        assert [p.name for p in (compare_repos.CACHE_DIR / "repos").iterdir()] == [entry.name]
+
+
+# ---------------------------------------------------------------------------
+# match_components
+# ---------------------------------------------------------------------------
+
+def _component(kind, name, keywords=(), line_count=10):
+    return compare_repos.Component(kind=kind, name=name, repo="r", path=name, keywords=sorted(keywords),
+                                   line_count=line_count)
+
+
+def _brute_force(ours_list, theirs_list, threshold):
+    """Reference all-pairs matcher: the nested loop match_components' inverted index replaces."""
+    def jaccard(a, b):
+        return len(a & b) / len(a | b) if a and b else 0.0
+
+    def words(name):
+        return set(name.replace("-", " ").replace("_", " ").lower().split())
+
+    def sim(ours, theirs):
+        ns = 1.0 if ours.name == theirs.name else jaccard(words(ours.name), words(theirs.name))
+        return 0.6 * ns + 0.4 * jaccard(set(ours.keywords), set(theirs.keywords))
+
+    matches = [
+        (ours.name, theirs.name, sim(ours, theirs))
+        for ours in ours_list for theirs in theirs_list
+        if ours.kind == theirs.kind and sim(ours, theirs) >= threshold
+    ]
+    matches.sort(key=lambda m: m[2], reverse=True)
+    our_names = {c.name for c in ours_list}
+    unmatched = [
+        theirs.name for theirs in theirs_list
+        if max([sim(o, theirs) for o in ours_list if o.kind == theirs.kind], default=0.0) < threshold
+        and theirs.name not in our_names
+    ]
+    return matches, unmatched
+
+
+OURS = [
+    _component("skill", "code-review", {"review", "diff", "checklist"}),
+    _component("skill", "brainstorming", {"ideas", "planning"}),
+    _component("agent", "security-sentinel", {"security", "audit"}),
+    _component("skill", "debugging", set()),
+]
+THEIRS = [
+    _component("skill", "code-review", {"review"}),             # exact name
+    _component("skill", "review-helper", set()),                # name word only
+    _component("skill", "idea-forge", {"ideas", "planning"}),   # keywords only
+    _component("agent", "code-review", {"review", "diff"}),     # other kind: never matches a skill
+    _component("agent", "security-audit", {"audit"}),           # name word + keyword
+    _component("skill", "pdf-export", {"pdf"}),                 # nothing shared
+    _component("skill", "debugging", set()),                    # exact name, no keywords either side
+]
+
+
+def _names(matches):
+    return [(m.ours.name, m.theirs.name, m.similarity) for m in matches]
+
+
+class TestMatchComponents:
+    @pytest.mark.parametrize("threshold", [0.15, 0.3, 0.05, 0.0, -1.0])
+    def test_matches_brute_force(self, threshold):
+        matches, unmatched = compare_repos.match_components(OURS, THEIRS, threshold=threshold)
+        expected_matches, expected_unmatched = _brute_force(OURS, THEIRS, threshold)
+        assert sorted(_names(matches)) == sorted(expected_matches)
+        assert [m.similarity for m in matches] == [m[2] for m in expected_matches]
+        assert [c.name for c in unmatched] == expected_unmatched
+
+    def test_name_only_and_keyword_only_overlaps_found(self):
+        pairs = {(o, t) for o, t, _ in _names(compare_repos.match_components(OURS, THEIRS, threshold=0.1)[0])}
+        assert ("code-review", "review-helper") in pairs  # shared name word, no keywords
+        assert ("brainstorming", "idea-forge") in pairs   # shared keywords, no name word
+        assert ("security-sentinel", "security-audit") in pairs
+
+    def test_kinds_never_cross(self):
+        matches, _ = compare_repos.match_components(OURS, THEIRS, threshold=0.0)
+        assert all(m.ours.kind == m.theirs.kind for m in matches)
+
+    def test_zero_threshold_pairs_every_same_kind_component(self):
+        matches, unmatched = compare_repos.match_components(OURS, THEIRS, threshold=0.0)
+        same_kind = sum(o.kind == t.kind for o in OURS for t in THEIRS)
+        assert len(matches) == same_kind
+        assert unmatched == []
+
+    def test_unmatched_excludes_components_we_have_by_name(self):
+        ours = [_component("skill", "alpha", {"one"})]
+        theirs = [_component("agent", "alpha", {"two"}), _component("skill", "beta", {"three"})]
+        _, unmatched = compare_repos.match_components(ours, theirs)
+        assert [c.name for c in unmatched] == ["beta"]
+
+
+class TestMatchComponentsTopK:
+    # One of our skills against five externals: two high-similarity, three lower ones
+    OURS = [_component("skill", "code-review", {"review", "diff", "checklist", "pr"})]
+    THEIRS = [
+        _component("skill", "code-review", {"review"}),
+        _component("skill", "code-review-pro", {"review", "diff", "checklist", "pr"}),
+        _component("skill", "review-notes", {"review"}),
+        _component("skill", "pr-tools", {"pr", "diff"}),
+        _component("skill", "checklists", {"checklist"}),
+    ]
+
+    def _sims(self, top_k):
+        matches, _ = compare_repos.match_components(self.OURS, self.THEIRS, threshold=0.05, top_k=top_k)
+        return [m.similarity for m in matches]
+
+    def test_keeps_all_high_similarity_plus_top_k_lower(self):
+        full = self._sims(0)
+        high = [s for s in full if s >= compare_repos.HIGH_SIMILARITY]
+        low = [s for s in full if s < compare_repos.HIGH_SIMILARITY]
+        assert len(high) == 2 and len(low) == 3
+        assert self._sims(1) == high + low[:1]
+
+    def test_high_similarity_matches_survive_top_one(self):
+        sims = self._sims(1)
+        assert sum(s >= compare_repos.HIGH_SIMILARITY for s in sims) == 2
+
+    def test_no_cap_when_under_k(self):
+        assert self._sims(10) == self._sims(0)
+
+    def test_top_k_does_not_create_unmatched(self):
+        _, unmatched = compare_repos.match_components(self.OURS, self.THEIRS, threshold=0.05, top_k=1)
+        assert unmatched == []